@@ -52,7 +52,8 @@ class AIAgent:
         """
         self.agent_id = agent_id
         self.role = role
-        self.hub = communication_hub
+        # A view of the shared hub that always acts as this agent
+        self.hub = communication_hub.for_agent(agent_id, role)
         self.model_name = model_name
         self.memory = []
         self.active = True
@@ -99,7 +100,7 @@ class AIAgent:
                 self._handle_knowledge_share(message)
         
         try:
-            self.hub.subscribe_to_messages(handle_message)
+            self.hub.subscribe_to_messages(handle_message, self.agent_id, self.role)
         except Exception as e:
             print(f"Agent {self.agent_id} message listener error: {e}")
     
@@ -112,11 +113,7 @@ class AIAgent:
             
             # Submit bid
             task_id = message.get("content", {}).get("task_id")
-            self.hub.redis_client.hset(
-                f"tasks:bids:{task_id}",
-                self.agent_id,
-                bid_value
-            )
+            self.hub.submit_bid(task_id, bid_value, self.agent_id)
     
     def _calculate_bid(self, task: Dict[str, Any]) -> float:
         """Calculate bid for task (lower is better)"""
@@ -230,15 +227,17 @@ class MultiAgentCoordinator:
     """
     
     def __init__(self, redis_config: Optional[Dict] = None,
-                 vector_db_config: Optional[Dict] = None):
+                 vector_db_config: Optional[Dict] = None,
+                 hub: Optional[AgentCommunicationHub] = None):
         """
         Initialize multi-agent coordinator.
         
         Args:
             redis_config: Redis configuration
             vector_db_config: Vector database configuration
+            hub: Existing communication hub to reuse (optional)
         """
-        self.hub = AgentCommunicationHub(redis_config)
+        self.hub = hub or AgentCommunicationHub(redis_config)
         self.vector_db = VectorDatabaseManager(
             db_type=vector_db_config.get("type", "chromadb") if vector_db_config else "chromadb",
             config=vector_db_config or {}
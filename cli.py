@@ -3,55 +3,53 @@
 import sys
 import subprocess
 
+# command -> (script, whether extra args are passed through)
+COMMANDS = {
+    "review": ("agents/code_reviewer.py", True),
+    "test": ("agents/tester.py", False),
+    "deploy": ("agents/deployer.py", True),
+    "validate_openapi": ("tools/openapi_validator.py", True),
+    "fetch_data": ("tools/data_fetcher.py", True),
+    "convert_format": ("tools/format_converter.py", True),
+    "handle_webhook": ("integrations/webhook_handler.py", True),
+    "automate": ("integrations/automation.py", True),
+    "manage_linear": ("integrations/linear_manager.py", True),
+    "get_token": ("configs/token_manager.py", True),
+    "foss_token": ("configs/foss_token_manager.py", True),
+    "memory": ("tools/memory_manager.py", True),
+    "analyze_code": ("tools/code_analyzer.py", True),
+    "create_project": ("tools/project_manager.py", True),
+    "memory_config": ("configs/memory_config.py", True),
+    "hierarchical_memory": ("tools/hierarchical_memory.py", True),
+    "vector_db": ("tools/vector_database.py", True),
+    "agent_comm": ("tools/agent_communication.py", True),
+    "multiagent": ("agents/multiagent_coordinator.py", True),
+    "research": ("tools/research_assistant.py", True),
+}
+
 def run_command(cmd):
     subprocess.run(cmd, shell=True)
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def build_command(command, args):
+    """Return the shell command for a CLI command, or None if unknown"""
+    if command not in COMMANDS:
+        return None
+    script, pass_args = COMMANDS[command]
+    return f"python {script} {' '.join(args)}" if pass_args else f"python {script}"
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
         print("Usage: python cli.py <command> [args...]")
-        print("Commands: review, test, deploy, validate_openapi, fetch_data, convert_format, handle_webhook, automate, manage_linear, get_token, foss_token, memory, analyze_code, create_project, memory_config, hierarchical_memory, vector_db, agent_comm, multiagent, research")
+        print(f"Commands: {', '.join(COMMANDS)}")
         sys.exit(1)
-    command = sys.argv[1]
-    args = sys.argv[2:]
-    if command == "review":
-        run_command(f"python agents/code_reviewer.py {' '.join(args)}")
-    elif command == "test":
-        run_command("python agents/tester.py")
-    elif command == "deploy":
-        run_command(f"python agents/deployer.py {' '.join(args)}")
-    elif command == "validate_openapi":
-        run_command(f"python tools/openapi_validator.py {' '.join(args)}")
-    elif command == "fetch_data":
-        run_command(f"python tools/data_fetcher.py {' '.join(args)}")
-    elif command == "convert_format":
-        run_command(f"python tools/format_converter.py {' '.join(args)}")
-    elif command == "handle_webhook":
-        run_command(f"python integrations/webhook_handler.py {' '.join(args)}")
-    elif command == "automate":
-        run_command(f"python integrations/automation.py {' '.join(args)}")
-    elif command == "manage_linear":
-        run_command(f"python integrations/linear_manager.py {' '.join(args)}")
-    elif command == "get_token":
-        run_command(f"python configs/token_manager.py {' '.join(args)}")
-    elif command == "memory":
-        run_command(f"python tools/memory_manager.py {' '.join(args)}")
-    elif command == "analyze_code":
-        run_command(f"python tools/code_analyzer.py {' '.join(args)}")
-    elif command == "create_project":
-        run_command(f"python tools/project_manager.py {' '.join(args)}")
-    elif command == "memory_config":
-        run_command(f"python configs/memory_config.py {' '.join(args)}")
-    elif command == "hierarchical_memory":
-        run_command(f"python tools/hierarchical_memory.py {' '.join(args)}")
-    elif command == "foss_token":
-        run_command(f"python configs/foss_token_manager.py {' '.join(args)}")
-    elif command == "vector_db":
-        run_command(f"python tools/vector_database.py {' '.join(args)}")
-    elif command == "agent_comm":
-        run_command(f"python tools/agent_communication.py {' '.join(args)}")
-    elif command == "multiagent":
-        run_command(f"python agents/multiagent_coordinator.py {' '.join(args)}")
-    elif command == "research":
-        run_command(f"python tools/research_assistant.py {' '.join(args)}")
+    command = argv[0]
+    args = argv[1:]
+    cmd = build_command(command, args)
+    if cmd is None:
+        print(f"Unknown command: {command}")
     else:
-        print(f"Unknown command: {command}")
\ No newline at end of file
+        run_command(cmd)
+
+if __name__ == "__main__":
+    main()
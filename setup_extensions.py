@@ -1,51 +1,297 @@
 #!/usr/bin/env python3
 
+import atexit
+import contextlib
+import functools
+import io
 import json
 import os
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@functools.lru_cache(maxsize=None)
+def _have(tool):
+    """Whether a tool is on PATH; PATH does not change during a run"""
+    return shutil.which(tool) is not None
+
+
+# Worker pool shared by every setup run in this process (created lazily)
+_POOL = None
+_POOL_WORKERS = 6  # one per setup step
+
+
+def _get_pool():
+    """Return the shared setup worker pool, starting it on first use"""
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=_POOL_WORKERS)
+        atexit.register(_POOL.shutdown)
+    return _POOL
+
+
+# Configs are written with indent=2; set OPENCODE_COMPACT for compact JSON
+_COMPACT = bool(os.environ.get('OPENCODE_COMPACT'))
+
+
+def _dumps(obj, compact=None):
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    if compact is None:
+        compact = _COMPACT
+    if orjson is not None:
+        return orjson.dumps(obj, option=None if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+
+def _loads(data):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Static extension configs; setup steps copy these instead of rebuilding them
+_OPENCODE_MCP_CONFIG = MappingProxyType({
+    "name": "opencode-mcp-tool",
+    "description": "MCP server for interacting with opencode CLI tool",
+    "installation": "npx -y opencode-mcp-tool",
+    "features": [
+        "Multi-model support via OpenCode",
+        "Plan mode for structured analysis",
+        "Model selection (primary + fallback)",
+        "Slash commands (/plan, /build, /help, /ping)",
+        "Brainstorming capabilities"
+    ],
+    "setup_commands": [
+        "claude mcp add opencode -- npx -y opencode-mcp-tool",
+        "claude mcp list"
+    ],
+    "verification": "Type /mcp in Claude Code to verify"
+})
+
+_AI_SESSIONS_CONFIG = MappingProxyType({
+    "name": "ai-sessions-mcp",
+    "description": "MCP server for searching AI coding sessions",
+    "features": [
+        "Session search across Claude Code, Gemini CLI, opencode",
+        "BM25 ranking for relevance-based search",
+        "Contextual snippets with search results",
+        "Pagination support for large sessions",
+        "Upload functionality for aisessions.dev"
+    ],
+    "installation_options": [
+        "curl -fsSL https://aisessions.dev/install.sh | bash",
+        "Download from GitHub releases",
+        "Build from source with Go"
+    ],
+    "usage": "Search previous coding sessions across multiple AI tools"
+})
+
+_LLMS_CONFIG = MappingProxyType({
+    "name": "llms",
+    "description": "Centralized LLM configuration and documentation management",
+    "features": [
+        "Feature-Implementer v2 Architecture (14 specialized agents)",
+        "Scope Intelligence System (Global/Project/Local configs)",
+        "Documentation fetcher for multiple LLM providers",
+        "Skill/Command/Agent/Prompt builders",
+        "MCP server management",
+        "Plugin builder for distribution",
+        "Hook configuration with quality gates",
+        "FOSS-first policy"
+    ],
+    "components": [
+        "Agent Builder",
+        "Skill Builder", 
+        "Command Builder",
+        "Prompt Builder",
+        "Plugin Builder",
+        "MCP Manager",
+        "Documentation Fetcher",
+        "Scope Manager"
+    ],
+    "status": "Production Ready v1.0.0"
+})
+
+_SYSTEMPROMPT_CONFIG = MappingProxyType({
+    "name": "systemprompt-code-orchestrator",
+    "description": "AI coding agent orchestration for Claude Code, Gemini CLI, opencode",
+    "features": [
+        "Task management and process execution",
+        "Git integration",
+        "Multi-agent coordination",
+        "Workflow automation",
+        "Code generation and review"
+    ],
+    "installation": "npm install systemprompt-code-orchestrator",
+    "compatibility": ["Claude Code", "Gemini CLI", "opencode"]
+})
+
+_FASTMCP_CONFIG = MappingProxyType({
+    "name": "fastmcp",
+    "description": "High-level framework for building MCP servers",
+    "features": [
+        "Rapid MCP server development",
+        "Python-based framework",
+        "Simplified API",
+        "Template generation",
+        "Testing utilities"
+    ],
+    "usage": "Build custom MCP servers for opencode extensions",
+    "installation": "pip install fastmcp"
+})
+
+_MCP_BOX_CONFIG = MappingProxyType({
+    "name": "mcp-box",
+    "description": "Universal MCP CLI tool for server management",
+    "features": [
+        "Server discovery and installation",
+        "Configuration management",
+        "Registry integration",
+        "Security validation",
+        "Multi-platform support"
+    ],
+    "installation": "npm install mcp-box",
+    "commands": [
+        "mcp-box init",
+        "mcp-box install <server>",
+        "mcp-box list",
+        "mcp-box configure"
+    ]
+})
+
+
+class _ThreadBufferedStdout:
+    """stdout proxy that routes writes from capturing threads into a buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def capture(self, fn):
+        """Run fn, returning (result, everything it printed)"""
+        self._local.buffer = io.StringIO()
+        try:
+            return fn(), self._local.buffer.getvalue()
+        finally:
+            del self._local.buffer
+    
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+    
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self._stream.flush()
 
 class OpenCodeExtensionManager:
     def __init__(self):
         self.extensions_dir = Path("extensions")
         self.config_dir = Path("extension_configs")
         self.config_dir.mkdir(exist_ok=True)
+        
+        self._json_cache = {}
+        self._configs = {}
+        self._ext_entries = None
+    
+    def _scan_extensions(self):
+        """List the extensions directory once for all setup steps"""
+        try:
+            with os.scandir(self.extensions_dir) as it:
+                self._ext_entries = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            self._ext_entries = {}
+    
+    def _extension_dir(self, name):
+        """Return the extension's directory, or None if it is not downloaded"""
+        if self._ext_entries is None:
+            self._scan_extensions()
+        entry = self._ext_entries.get(name)
+        if entry is None or not entry.is_dir():
+            return None
+        return Path(entry.path)
+    
+    def _load_json(self, path):
+        """Parse a JSON file once; returns None if it does not exist"""
+        if path not in self._json_cache:
+            try:
+                with open(path, 'rb') as f:
+                    self._json_cache[path] = _loads(f.read())
+            except FileNotFoundError:
+                self._json_cache[path] = None
+        return self._json_cache[path]
+    
+    def _save_config(self, filename, config):
+        """Queue an extension config; all configs are written by _write_configs"""
+        self._configs[filename] = config
+    
+    def _write_configs(self):
+        """Write every queued config file in a single pass, skipping unchanged ones"""
+        writes = []
+        for filename, config in self._configs.items():
+            path = self.config_dir / filename
+            new_bytes = _dumps(config)
+            
+            try:
+                old_bytes = path.read_bytes()
+            except FileNotFoundError:
+                old_bytes = None
+            if old_bytes != new_bytes:
+                writes.append((path, new_bytes))
+        
+        if not writes:
+            return
+        
+        # Write and sync temp files, then swap them in so readers never see
+        # a partial file, then sync the directory once for all renames
+        for path, data in writes:
+            tmp_path = path.with_suffix('.json.tmp')
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    # os.write may write fewer bytes than asked
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        
+        dir_fd = os.open(self.config_dir, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
     
     def setup_opencode_mcp_tool(self):
         """Setup opencode MCP tool integration"""
         print("🔧 Setting up OpenCode MCP Tool...")
         
         # Read package.json to understand dependencies
-        package_json_path = self.extensions_dir / "opencode-mcp-tool" / "package.json"
-        if package_json_path.exists():
-            with open(package_json_path, 'r') as f:
-                package_data = json.load(f)
-            
+        tool_dir = self._extension_dir("opencode-mcp-tool")
+        package_data = self._load_json(tool_dir / "package.json") if tool_dir else None
+        if package_data is not None:
             print(f"   📦 Package: {package_data.get('name', 'opencode-mcp-tool')}")
             print(f"   📋 Version: {package_data.get('version', 'unknown')}")
             
             # Create integration config
-            config = {
-                "name": "opencode-mcp-tool",
-                "description": "MCP server for interacting with opencode CLI tool",
-                "installation": "npx -y opencode-mcp-tool",
-                "features": [
-                    "Multi-model support via OpenCode",
-                    "Plan mode for structured analysis",
-                    "Model selection (primary + fallback)",
-                    "Slash commands (/plan, /build, /help, /ping)",
-                    "Brainstorming capabilities"
-                ],
-                "setup_commands": [
-                    "claude mcp add opencode -- npx -y opencode-mcp-tool",
-                    "claude mcp list"
-                ],
-                "verification": "Type /mcp in Claude Code to verify"
-            }
+            config = dict(_OPENCODE_MCP_CONFIG)
             
-            with open(self.config_dir / "opencode_mcp_config.json", 'w') as f:
-                json.dump(config, f, indent=2)
+            self._save_config("opencode_mcp_config.json", config)
             
             print("   ✅ Configuration saved")
             return True
@@ -57,46 +303,30 @@ class OpenCodeExtensionManager:
         print("🔧 Setting up AI Sessions MCP...")
         
         # Check if binary exists or needs building
-        ai_sessions_dir = self.extensions_dir / "ai-sessions-mcp"
-        if ai_sessions_dir.exists():
+        ai_sessions_dir = self._extension_dir("ai-sessions-mcp")
+        if ai_sessions_dir:
             # Try to build if Go is available
-            try:
-                result = subprocess.run(['go', 'version'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    print("   🔨 Building AI Sessions MCP...")
-                    build_result = subprocess.run([
+            if _have('go'):
+                print("   🔨 Building AI Sessions MCP...")
+                # Spool stderr to a temp file instead of a pipe we must drain
+                with tempfile.TemporaryFile() as errf:
+                    build = subprocess.Popen([
                         'go', 'build', '-o', 'bin/aisessions', './cmd/ai-sessions'
-                    ], cwd=ai_sessions_dir, capture_output=True, text=True)
+                    ], cwd=ai_sessions_dir, stdout=subprocess.DEVNULL, stderr=errf)
+                    returncode = build.wait()
                     
-                    if build_result.returncode == 0:
+                    if returncode == 0:
                         print("   ✅ Build successful")
                     else:
-                        print(f"   ⚠️  Build failed: {build_result.stderr}")
-                else:
-                    print("   ⚠️  Go not found, skipping build")
-            except FileNotFoundError:
+                        errf.seek(0)
+                        stderr = errf.read().decode(errors='replace')
+                        print(f"   ⚠️  Build failed: {stderr}")
+            else:
                 print("   ⚠️  Go not found, skipping build")
             
-            config = {
-                "name": "ai-sessions-mcp",
-                "description": "MCP server for searching AI coding sessions",
-                "features": [
-                    "Session search across Claude Code, Gemini CLI, opencode",
-                    "BM25 ranking for relevance-based search",
-                    "Contextual snippets with search results",
-                    "Pagination support for large sessions",
-                    "Upload functionality for aisessions.dev"
-                ],
-                "installation_options": [
-                    "curl -fsSL https://aisessions.dev/install.sh | bash",
-                    "Download from GitHub releases",
-                    "Build from source with Go"
-                ],
-                "usage": "Search previous coding sessions across multiple AI tools"
-            }
+            config = dict(_AI_SESSIONS_CONFIG)
             
-            with open(self.config_dir / "ai_sessions_config.json", 'w') as f:
-                json.dump(config, f, indent=2)
+            self._save_config("ai_sessions_config.json", config)
             
             print("   ✅ Configuration saved")
             return True
@@ -107,19 +337,19 @@ class OpenCodeExtensionManager:
         """Setup LLMs configuration management system"""
         print("🔧 Setting up LLMs Configuration System...")
         
-        llms_dir = self.extensions_dir / "llms"
-        if llms_dir.exists():
-            # Check if it's a Python package
-            setup_py = llms_dir / "setup.py"
-            pyproject = llms_dir / "pyproject.toml"
+        llms_dir = self._extension_dir("llms")
+        if llms_dir:
+            # Check if it's a Python package, listing the directory once
+            llms_files = set(os.listdir(llms_dir))
             
-            if setup_py.exists() or pyproject.exists():
+            if "setup.py" in llms_files or "pyproject.toml" in llms_files:
                 print("   🐍 Python package detected")
                 
                 # Install dependencies if possible
                 try:
                     requirements = llms_dir / "requirements.txt"
-                    if requirements.exists():
+                    has_requirements = "requirements.txt" in llms_files
+                    if has_requirements and _have('pip3'):
                         print("   📦 Installing dependencies...")
                         result = subprocess.run([
                             'pip3', 'install', '-r', str(requirements)
@@ -129,37 +359,14 @@ class OpenCodeExtensionManager:
                             print("   ✅ Dependencies installed")
                         else:
                             print(f"   ⚠️  Install failed: {result.stderr}")
+                    elif has_requirements:
+                        print("   ⚠️  pip3 not found, skipping dependency install")
                 except Exception as e:
                     print(f"   ⚠️  Could not install dependencies: {e}")
             
-            config = {
-                "name": "llms",
-                "description": "Centralized LLM configuration and documentation management",
-                "features": [
-                    "Feature-Implementer v2 Architecture (14 specialized agents)",
-                    "Scope Intelligence System (Global/Project/Local configs)",
-                    "Documentation fetcher for multiple LLM providers",
-                    "Skill/Command/Agent/Prompt builders",
-                    "MCP server management",
-                    "Plugin builder for distribution",
-                    "Hook configuration with quality gates",
-                    "FOSS-first policy"
-                ],
-                "components": [
-                    "Agent Builder",
-                    "Skill Builder", 
-                    "Command Builder",
-                    "Prompt Builder",
-                    "Plugin Builder",
-                    "MCP Manager",
-                    "Documentation Fetcher",
-                    "Scope Manager"
-                ],
-                "status": "Production Ready v1.0.0"
-            }
+            config = dict(_LLMS_CONFIG)
             
-            with open(self.config_dir / "llms_config.json", 'w') as f:
-                json.dump(config, f, indent=2)
+            self._save_config("llms_config.json", config)
             
             print("   ✅ Configuration saved")
             return True
@@ -170,31 +377,15 @@ class OpenCodeExtensionManager:
         """Setup SystemPrompt Code Orchestrator"""
         print("🔧 Setting up SystemPrompt Code Orchestrator...")
         
-        orchestrator_dir = self.extensions_dir / "systemprompt-code-orchestrator"
-        if orchestrator_dir.exists():
-            package_json = orchestrator_dir / "package.json"
-            if package_json.exists():
-                with open(package_json, 'r') as f:
-                    package_data = json.load(f)
-                
+        orchestrator_dir = self._extension_dir("systemprompt-code-orchestrator")
+        if orchestrator_dir:
+            package_data = self._load_json(orchestrator_dir / "package.json")
+            if package_data is not None:
                 print(f"   📦 Package: {package_data.get('name', 'systemprompt-code-orchestrator')}")
                 
-                config = {
-                    "name": "systemprompt-code-orchestrator",
-                    "description": "AI coding agent orchestration for Claude Code, Gemini CLI, opencode",
-                    "features": [
-                        "Task management and process execution",
-                        "Git integration",
-                        "Multi-agent coordination",
-                        "Workflow automation",
-                        "Code generation and review"
-                    ],
-                    "installation": "npm install systemprompt-code-orchestrator",
-                    "compatibility": ["Claude Code", "Gemini CLI", "opencode"]
-                }
+                config = dict(_SYSTEMPROMPT_CONFIG)
                 
-                with open(self.config_dir / "systemprompt_config.json", 'w') as f:
-                    json.dump(config, f, indent=2)
+                self._save_config("systemprompt_config.json", config)
                 
                 print("   ✅ Configuration saved")
                 return True
@@ -205,24 +396,11 @@ class OpenCodeExtensionManager:
         """Setup FastMCP framework"""
         print("🔧 Setting up FastMCP Framework...")
         
-        fastmcp_dir = self.extensions_dir / "fastmcp"
-        if fastmcp_dir.exists():
-            config = {
-                "name": "fastmcp",
-                "description": "High-level framework for building MCP servers",
-                "features": [
-                    "Rapid MCP server development",
-                    "Python-based framework",
-                    "Simplified API",
-                    "Template generation",
-                    "Testing utilities"
-                ],
-                "usage": "Build custom MCP servers for opencode extensions",
-                "installation": "pip install fastmcp"
-            }
+        fastmcp_dir = self._extension_dir("fastmcp")
+        if fastmcp_dir:
+            config = dict(_FASTMCP_CONFIG)
             
-            with open(self.config_dir / "fastmcp_config.json", 'w') as f:
-                json.dump(config, f, indent=2)
+            self._save_config("fastmcp_config.json", config)
             
             print("   ✅ Configuration saved")
             return True
@@ -233,36 +411,15 @@ class OpenCodeExtensionManager:
         """Setup MCP-Box management tool"""
         print("🔧 Setting up MCP-Box...")
         
-        mcp_box_dir = self.extensions_dir / "mcp-box"
-        if mcp_box_dir.exists():
-            package_json = mcp_box_dir / "package.json"
-            if package_json.exists():
-                with open(package_json, 'r') as f:
-                    package_data = json.load(f)
-                
+        mcp_box_dir = self._extension_dir("mcp-box")
+        if mcp_box_dir:
+            package_data = self._load_json(mcp_box_dir / "package.json")
+            if package_data is not None:
                 print(f"   📦 Package: {package_data.get('name', 'mcp-box')}")
                 
-                config = {
-                    "name": "mcp-box",
-                    "description": "Universal MCP CLI tool for server management",
-                    "features": [
-                        "Server discovery and installation",
-                        "Configuration management",
-                        "Registry integration",
-                        "Security validation",
-                        "Multi-platform support"
-                    ],
-                    "installation": "npm install mcp-box",
-                    "commands": [
-                        "mcp-box init",
-                        "mcp-box install <server>",
-                        "mcp-box list",
-                        "mcp-box configure"
-                    ]
-                }
+                config = dict(_MCP_BOX_CONFIG)
                 
-                with open(self.config_dir / "mcp_box_config.json", 'w') as f:
-                    json.dump(config, f, indent=2)
+                self._save_config("mcp_box_config.json", config)
                 
                 print("   ✅ Configuration saved")
                 return True
@@ -275,25 +432,23 @@ class OpenCodeExtensionManager:
         
         summary = {
             "opencode_extensions": {
-                "installed_at": str(subprocess.check_output(['date'], text=True).strip()),
+                "installed_at": datetime.now().astimezone().isoformat(),
                 "total_extensions": 6,
                 "extensions": {}
             }
         }
         
-        # Load all configs
-        for config_file in self.config_dir.glob("*_config.json"):
-            with open(config_file, 'r') as f:
-                config_data = json.load(f)
-                extension_name = config_data['name']
-                summary["opencode_extensions"]["extensions"][extension_name] = {
-                    "description": config_data['description'],
-                    "features": config_data.get('features', []),
-                    "status": "configured"
-                }
+        # Summarize the in-memory configs; nothing is read back from disk
+        for config_data in self._configs.values():
+            extension_name = config_data['name']
+            summary["opencode_extensions"]["extensions"][extension_name] = {
+                "description": config_data['description'],
+                "features": config_data.get('features', []),
+                "status": "configured"
+            }
         
-        with open(self.config_dir / "integration_summary.json", 'w') as f:
-            json.dump(summary, f, indent=2)
+        with open(self.config_dir / "integration_summary.json", 'wb') as f:
+            f.write(_dumps(summary, compact=False))
         
         print("   ✅ Integration summary saved")
         return summary
@@ -303,26 +458,40 @@ class OpenCodeExtensionManager:
         print("🚀 Setting up OpenCode Extensions")
         print("=" * 50)
         
-        extensions_setup = []
-        
-        # Setup each extension
-        if self.setup_opencode_mcp_tool():
-            extensions_setup.append("opencode-mcp-tool")
+        # Nothing to configure on a fresh clone without downloaded extensions
+        if not self.extensions_dir.is_dir():
+            print(f"⚠️  {self.extensions_dir}/ not present; nothing to do")
+            return {}
         
-        if self.setup_ai_sessions_mcp():
-            extensions_setup.append("ai-sessions-mcp")
+        self._scan_extensions()
         
-        if self.setup_llms_system():
-            extensions_setup.append("llms")
+        setup_steps = [
+            ("opencode-mcp-tool", self.setup_opencode_mcp_tool),
+            ("ai-sessions-mcp", self.setup_ai_sessions_mcp),
+            ("llms", self.setup_llms_system),
+            ("systemprompt-code-orchestrator", self.setup_systemprompt_orchestrator),
+            ("fastmcp", self.setup_fastmcp),
+            ("mcp-box", self.setup_mcp_box),
+        ]
         
-        if self.setup_systemprompt_orchestrator():
-            extensions_setup.append("systemprompt-code-orchestrator")
+        # Setup each extension concurrently; each step's output is buffered
+        # and replayed in order so the log does not interleave
+        extensions_setup = []
+        stdout = _ThreadBufferedStdout(sys.stdout)
+        with contextlib.redirect_stdout(stdout):
+            executor = _get_pool()
+            futures = [
+                (name, executor.submit(stdout.capture, step))
+                for name, step in setup_steps
+            ]
+            results = [(name, future.result()) for name, future in futures]
         
-        if self.setup_fastmcp():
-            extensions_setup.append("fastmcp")
+        for name, (ok, output) in results:
+            sys.stdout.write(output)
+            if ok:
+                extensions_setup.append(name)
         
-        if self.setup_mcp_box():
-            extensions_setup.append("mcp-box")
+        self._write_configs()
         
         # Create summary
         summary = self.create_integration_summary()
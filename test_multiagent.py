@@ -5,33 +5,45 @@ Basic tests for multi-agent system components.
 Run with: python test_multiagent.py
 """
 
+import contextlib
+import io
 import sys
 import os
 
+_HUB = None
+
+
+def _get_hub():
+    """Return the communication hub shared by all tests in this run"""
+    global _HUB
+    if _HUB is None:
+        from tools.agent_communication import AgentCommunicationHub
+        _HUB = AgentCommunicationHub()
+    return _HUB
+
 def test_imports():
-    """Test that all modules can be imported"""
+    """Test that all modules can be found without executing them"""
     print("Testing imports...")
     
-    try:
-        from tools.vector_database import VectorDatabaseManager
-        print("  ✓ vector_database")
-    except Exception as e:
-        print(f"  ✗ vector_database: {e}")
-        return False
+    import importlib.util
     
-    try:
-        from tools.agent_communication import AgentCommunicationHub, AgentRole, MessageType
-        print("  ✓ agent_communication")
-    except Exception as e:
-        print(f"  ✗ agent_communication: {e}")
-        return False
+    # Only locate the modules; the tests that use them pay the import cost
+    modules = [
+        ("vector_database", "tools.vector_database"),
+        ("agent_communication", "tools.agent_communication"),
+        ("multiagent_coordinator", "agents.multiagent_coordinator"),
+    ]
     
-    try:
-        from agents.multiagent_coordinator import MultiAgentCoordinator, ProblemSolvingStrategy
-        print("  ✓ multiagent_coordinator")
-    except Exception as e:
-        print(f"  ✗ multiagent_coordinator: {e}")
-        return False
+    for label, module_name in modules:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except Exception as e:
+            print(f"  ✗ {label}: {e}")
+            return False
+        if spec is None:
+            print(f"  ✗ {label}: module not found")
+            return False
+        print(f"  ✓ {label}")
     
     return True
 
@@ -50,12 +62,15 @@ def test_vector_database():
         })
         print("  ✓ Initialized ChromaDB")
         
-        # Add documents
+        # Add a realistic batch so the backend embeds it in one call
         docs = [
-            {"content": "Test document 1", "metadata": {"test": True}},
-            {"content": "Test document 2", "metadata": {"test": True}}
+            {"content": f"Test document {i}", "metadata": {"test": True, "i": i}}
+            for i in range(64)
         ]
         doc_ids = db.add_documents(docs)
+        if len(doc_ids) != len(docs):
+            print(f"  ✗ Added {len(doc_ids)} of {len(docs)} documents")
+            return False
         print(f"  ✓ Added {len(doc_ids)} documents")
         
         # Search
@@ -73,6 +88,78 @@ def test_vector_database():
         return False
 
 
+def test_find_duplicates():
+    """Test duplicate detection across files that share a long prefix"""
+    print("\nTesting duplicate detection...")
+    
+    import tempfile
+    
+    try:
+        from tools.code_analyzer import CodeAnalyzer, PREFIX_BYTES
+        
+        # Two pairs of duplicates whose prefixes match but sizes differ
+        prefix = b"#" * (PREFIX_BYTES + 1024)
+        contents = {
+            "a.py": prefix + b"1" * 1000, "b.py": prefix + b"1" * 1000,
+            "c.py": prefix + b"2" * 50000, "d.py": prefix + b"2" * 50000,
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name, data in contents.items():
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.write(data)
+            
+            groups = CodeAnalyzer().find_duplicates(directory)
+            found = sorted(sorted(os.path.basename(p) for p in g["files"]) for g in groups)
+        
+        if found != [["a.py", "b.py"], ["c.py", "d.py"]]:
+            print(f"  ✗ Duplicate groups: {found}")
+            return False
+        print(f"  ✓ Found {len(found)} duplicate groups")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
+def test_format_converter():
+    """Test that JSON conversion matches a json.load/json.dump round trip"""
+    print("\nTesting format converter...")
+    
+    import json
+    import tempfile
+    
+    try:
+        from tools.format_converter import convert_json
+        
+        # Inputs where simply re-indenting the text would differ
+        cases = [
+            b'{"a": 1, "a": 2}', b'[1.0e5, 2.50, -0, 1E400]', b'["a\\/b"]',
+            b'{"x": "\\u00e9"}', b'["caf\xc3\xa9", "\x7f"]', b'[NaN, 12345678901234567890]',
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "in.json")
+            target = os.path.join(directory, "out.json")
+            for data in cases:
+                with open(source, "wb") as f:
+                    f.write(data)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    convert_json(source, target)
+                with open(target) as f:
+                    converted = f.read()
+                if converted != json.dumps(json.loads(data), indent=2):
+                    print(f"  ✗ {data!r} converted to {converted!r}")
+                    return False
+        print(f"  ✓ {len(cases)} inputs match json.dump output")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
 def test_agent_communication():
     """Test agent communication (requires Redis)"""
     print("\nTesting agent communication...")
@@ -81,7 +168,7 @@ def test_agent_communication():
         from tools.agent_communication import AgentCommunicationHub, AgentRole, MessageType
         
         # Try to connect
-        hub = AgentCommunicationHub()
+        hub = _get_hub()
         print("  ✓ Connected to Redis")
         
         # Register agent
@@ -104,6 +191,98 @@ def test_agent_communication():
         return False
 
 
+def test_shared_hub_routing():
+    """Test that agents registered on one hub each get their messages (requires Redis)"""
+    print("\nTesting shared hub routing...")
+    
+    import threading
+    import time
+    
+    try:
+        from tools.agent_communication import AgentRole, MessageType
+        
+        hub = _get_hub()
+        received = {AgentRole.PROBLEM_SOLVER: [], AgentRole.HEALER: []}
+        
+        # Register both agents on the same hub before either listener
+        # starts; each listener is given its agent's identity
+        agents = [("routing_solver", AgentRole.PROBLEM_SOLVER),
+                  ("routing_healer", AgentRole.HEALER)]
+        for agent_id, role in agents:
+            hub.register_agent(agent_id, role)
+        for agent_id, role in agents:
+            threading.Thread(
+                target=hub.subscribe_to_messages,
+                args=(received[role].append, agent_id, role),
+                daemon=True
+            ).start()
+        time.sleep(0.5)
+        print("  ✓ Registered two agents on one hub")
+        
+        for role in received:
+            hub.send_message(MessageType.STATUS_UPDATE, f"for {role.value}",
+                             recipient_role=role)
+        time.sleep(1.0)
+        
+        for role, messages in received.items():
+            contents = [m["content"] for m in messages]
+            if contents != [f"for {role.value}"]:
+                print(f"  ✗ {role.value} received {contents}")
+                return False
+            print(f"  ✓ {role.value} received its message")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        print("  ℹ Redis must be running for this test")
+        return False
+
+
+def test_shared_hub_auction():
+    """Test that the lowest bid wins when bidders share one hub (requires Redis)"""
+    print("\nTesting shared hub auction...")
+    
+    import threading
+    import time
+    
+    try:
+        from tools.agent_communication import AgentRole, MessageType
+        
+        hub = _get_hub()
+        
+        def bidder(agent_id, cost):
+            def handle(message):
+                if message["message_type"] == MessageType.TASK_REQUEST.value:
+                    hub.submit_bid(message["content"]["task_id"], cost, agent_id)
+            return handle
+        
+        # Both bidders are registered on the same hub
+        # The higher bidder registers last, so it holds the hub identity
+        for agent_id, cost in [("bidder_low", 3.0), ("bidder_high", 7.0)]:
+            hub.register_agent(agent_id, AgentRole.PROBLEM_SOLVER)
+            threading.Thread(
+                target=hub.subscribe_to_messages,
+                args=(bidder(agent_id, cost), agent_id, AgentRole.PROBLEM_SOLVER),
+                daemon=True
+            ).start()
+            time.sleep(0.5)
+        print("  ✓ Registered two bidders on one hub")
+        
+        winner = hub.allocate_task({"type": "test"})
+        if winner != "bidder_low":
+            print(f"  ✗ Auction winner: {winner}")
+            return False
+        print(f"  ✓ Lowest bid won: {winner}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        print("  ℹ Redis must be running for this test")
+        return False
+
+
 def test_multiagent_coordinator():
     """Test multi-agent coordinator (requires Redis)"""
     print("\nTesting multi-agent coordinator...")
@@ -112,7 +291,7 @@ def test_multiagent_coordinator():
         from agents.multiagent_coordinator import MultiAgentCoordinator, ProblemSolvingStrategy
         
         # Initialize
-        coordinator = MultiAgentCoordinator()
+        coordinator = MultiAgentCoordinator(hub=_get_hub())
         print("  ✓ Initialized coordinator")
         
         # Spawn agents
@@ -141,51 +320,58 @@ def test_cli_integration():
     
     import subprocess
     
+    # (subcommand, script expected in the usage output)
+    checks = [
+        ("vector_db", "vector_database.py"),
+        ("agent_comm", "agent_communication.py"),
+        ("multiagent", "multiagent_coordinator.py"),
+    ]
+    
+    # Dispatch each subcommand through cli.main, all started at once so
+    # they run side by side; each is checked on its own
+    code = "import sys, cli; cli.main(sys.argv[1:])"
     try:
-        # Test vector_db help
-        result = subprocess.run(
-            ["python3", "cli.py", "vector_db"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if "vector_database.py" in result.stderr or "Usage" in result.stdout:
-            print("  ✓ vector_db CLI accessible")
-        else:
-            print("  ⚠ vector_db CLI response unexpected")
-        
-        # Test agent_comm help
-        result = subprocess.run(
-            ["python3", "cli.py", "agent_comm"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if "agent_communication.py" in result.stderr or "Usage" in result.stdout:
-            print("  ✓ agent_comm CLI accessible")
-        else:
-            print("  ⚠ agent_comm CLI response unexpected")
-        
-        # Test multiagent help
-        result = subprocess.run(
-            ["python3", "cli.py", "multiagent"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if "multiagent_coordinator.py" in result.stderr or "Usage" in result.stdout:
-            print("  ✓ multiagent CLI accessible")
-        else:
-            print("  ⚠ multiagent CLI response unexpected")
-        
-        return True
-        
+        procs = [
+            subprocess.Popen(
+                ["python3", "-c", code, subcommand],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            for subcommand, _ in checks
+        ]
     except Exception as e:
         print(f"  ✗ Error: {e}")
         return False
+    
+    for (subcommand, script), proc in zip(checks, procs):
+        try:
+            stdout, stderr = proc.communicate(timeout=10)
+        except Exception as e:
+            proc.kill()
+            proc.communicate()
+            print(f"  ⚠ {subcommand} CLI error: {e}")
+            continue
+        
+        if script in stderr or "Usage" in stdout:
+            print(f"  ✓ {subcommand} CLI accessible")
+        else:
+            print(f"  ⚠ {subcommand} CLI response unexpected")
+    
+    return True
+
+
+TESTS = [
+    ("Imports", test_imports),
+    ("Vector Database", test_vector_database),
+    ("Duplicate Detection", test_find_duplicates),
+    ("Format Converter", test_format_converter),
+    ("Agent Communication", test_agent_communication),
+    ("Shared Hub Routing", test_shared_hub_routing),
+    ("Shared Hub Auction", test_shared_hub_auction),
+    ("Multi-Agent Coordinator", test_multiagent_coordinator),
+    ("CLI Integration", test_cli_integration),
+]
 
 
 def main():
@@ -194,13 +380,16 @@ def main():
     print("Multi-Agent System - Basic Tests")
     print("=" * 60)
     
-    results = {
-        "Imports": test_imports(),
-        "Vector Database": test_vector_database(),
-        "Agent Communication": test_agent_communication(),
-        "Multi-Agent Coordinator": test_multiagent_coordinator(),
-        "CLI Integration": test_cli_integration()
-    }
+    # Each test's output is streamed as it runs, so a hang or crash shows
+    # how far the run got
+    results = {}
+    try:
+        for test_name, test in TESTS:
+            results[test_name] = bool(test())
+            sys.stdout.flush()
+    finally:
+        if _HUB is not None:
+            _HUB.close()
     
     print("\n" + "=" * 60)
     print("Test Results Summary")
@@ -0,0 +1,48 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional native line scanner for code_analyzer.py.
+
+Build in place with:  cythonize -i tools/_analyzer_native.pyx
+code_analyzer falls back to its pure-Python loop when this is not built.
+"""
+
+cdef inline bint _is_space(unsigned char c) nogil:
+    # ASCII whitespace as str.strip() sees it ('\n' is handled as a separator)
+    return c == 32 or 9 <= c <= 13 or 28 <= c <= 31
+
+
+def scan(const unsigned char[::1] buf, tuple prefixes=()):
+    """Return (total_lines, non_empty_lines, comment_lines) for a buffer.
+
+    Lines are split on '\\n' exactly like str.split('\\n'); a line is a
+    comment when its first non-whitespace bytes match one of `prefixes`.
+    """
+    cdef Py_ssize_t n = buf.shape[0]
+    cdef Py_ssize_t i, k, plen
+    cdef Py_ssize_t total = 1, non_empty = 0, comments = 0
+    cdef bint line_started = False
+    cdef unsigned char c
+    cdef bytes prefix
+    cdef const unsigned char *pp
+
+    for i in range(n):
+        c = buf[i]
+        if c == 10:
+            total += 1
+            line_started = False
+        elif not line_started and not _is_space(c):
+            line_started = True
+            non_empty += 1
+            for prefix in prefixes:
+                plen = len(prefix)
+                if i + plen > n:
+                    continue
+                pp = prefix
+                for k in range(plen):
+                    if buf[i + k] != pp[k]:
+                        break
+                else:
+                    comments += 1
+                    break
+
+    return total, non_empty, comments
@@ -5,13 +5,94 @@ Redis-based Agent Communication System for Multi-Agent Coordination.
 Enables democratic, decentralized communication between AI agents.
 """
 
+import asyncio
+import copy
 import json
+import struct
+import threading
 import time
 import uuid
 from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 from enum import Enum
 
+try:
+    import msgspec
+    _encoder = msgspec.msgpack.Encoder()
+    _decoder = msgspec.msgpack.Decoder()
+except ImportError:
+    msgspec = None
+
+# Trim the message/conversation logs on a hub's first write and every N writes
+# after that, so short-lived processes still trim
+LOG_TRIM_INTERVAL = 100
+
+# Auctions wait at most BID_WINDOW seconds for bids, and close early once no
+# new bid has arrived for BID_QUIET_PERIOD seconds after the first one
+BID_WINDOW = 5.0
+BID_QUIET_PERIOD = 0.05
+
+# Timestamps are stored as integer nanoseconds since the epoch; they are only
+# formatted as ISO 8601 for display
+_now_ns = time.time_ns
+TIMESTAMP_FIELDS = ("timestamp", "registered_at", "initiated_at",
+                    "requested_at", "last_heartbeat")
+
+
+def format_ts(ns: Optional[int]) -> Optional[str]:
+    """Format an integer nanosecond timestamp as ISO 8601."""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+def _for_display(record: Any) -> Any:
+    """Copy of a record with its known timestamp fields formatted as ISO 8601."""
+    if isinstance(record, list):
+        return [_for_display(item) for item in record]
+    if not isinstance(record, dict):
+        return record
+    shown = {}
+    for key, value in record.items():
+        if key in TIMESTAMP_FIELDS and isinstance(value, int):
+            shown[key] = format_ts(value)
+        else:
+            shown[key] = _for_display(value)
+    return shown
+
+
+def _encode(obj: Any) -> bytes:
+    """Serialize a Redis payload (MessagePack when msgspec is installed)"""
+    if msgspec is not None:
+        return _encoder.encode(obj)
+    return json.dumps(obj).encode()
+
+
+def _decode(data: bytes) -> Any:
+    """Deserialize a Redis payload written by either encoder"""
+    # JSON payloads are always objects, so they start with "{"
+    if msgspec is None or data[:1] == b"{":
+        return json.loads(data)
+    return _decoder.decode(data)
+
+
+def _msgpack_array_header(n: int) -> bytes:
+    """MessagePack array header for n elements."""
+    if n < 16:
+        return bytes((0x90 | n,))
+    if n < 0x10000:
+        return b"\xdc" + struct.pack(">H", n)
+    return b"\xdd" + struct.pack(">I", n)
+
+
+def _decode_batch(payloads: List[bytes]) -> List[Any]:
+    """Deserialize many Redis payloads, in one decoder call when possible"""
+    if msgspec is None or any(data[:1] == b"{" for data in payloads):
+        return [_decode(data) for data in payloads]
+    # Each payload is a complete MessagePack value, so prefixing an array
+    # header turns the concatenation into one decodable list
+    return _decoder.decode(_msgpack_array_header(len(payloads)) + b"".join(payloads))
+
 class MessageType(Enum):
     """Types of inter-agent messages"""
     TASK_REQUEST = "task_request"
@@ -37,6 +118,48 @@ class AgentRole(Enum):
     VOTER = "voter"
 
 
+# Messages are published once on a channel per event family instead of
+# per-agent / per-role channels. Names are bytes to match the raw (non-decoding) client.
+CHANNELS = {
+    MessageType.TASK_REQUEST: b"events:tasks",
+    MessageType.TASK_RESPONSE: b"events:tasks",
+    MessageType.VOTE_REQUEST: b"events:votes",
+    MessageType.VOTE_CAST: b"events:votes",
+    MessageType.CONSENSUS_REACHED: b"events:votes",
+    MessageType.STATUS_UPDATE: b"events:status",
+    MessageType.KNOWLEDGE_SHARE: b"events:knowledge",
+    MessageType.NOTE_TAKING: b"events:knowledge",
+    MessageType.HELP_REQUEST: b"events:alerts",
+    MessageType.SELF_HEAL: b"events:alerts",
+    MessageType.MONITOR_ALERT: b"events:alerts",
+}
+
+# The agent registry is split into an immutable base record (id, role,
+# registration time) and a separately written metadata hash, so metadata
+# updates never rewrite the base record
+REGISTRY_BASE = "agents:registry:base"
+REGISTRY_META = "agents:registry:meta"
+
+# Heartbeats are the raw 8-byte little-endian time_ns() value
+_HEARTBEAT = struct.Struct("<Q")
+
+
+def _unpack_heartbeat(value: Optional[bytes]) -> Optional[int]:
+    """Decode a stored heartbeat to nanoseconds (None if missing/expired)."""
+    return _HEARTBEAT.unpack(value)[0] if value else None
+
+
+# Atomic vote: check the vote is open and the agent has not voted, then record
+# it. Returns -1 if the vote is missing/expired, -2 if already voted, 1 if cast.
+CAST_VOTE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then return -2 end
+redis.call('HINCRBY', KEYS[3], ARGV[2], 1)
+redis.call('SADD', KEYS[2], ARGV[1])
+return 1
+"""
+
+
 class AgentCommunicationHub:
     """
     Redis-based communication hub for multi-agent systems.
@@ -55,10 +178,19 @@ class AgentCommunicationHub:
             "port": 6379,
             "db": 0
         }
-        self.redis_client = None
+        self._redis = None
+        self._pool = None
+        self._local = threading.local()
         self.pubsub = None
         self.agent_id = str(uuid.uuid4())
         self.agent_role = AgentRole.PROBLEM_SOLVER
+        self._cache_identity()
+        self._message_writes = 0
+        self._conversation_writes = 0
+        self._registered_base = None
+        self._registered_meta = None
+        # Shared with for_agent() views, so close() stops their listeners too
+        self._closed = threading.Event()
         
         self._connect_redis()
     
@@ -67,11 +199,13 @@ class AgentCommunicationHub:
         try:
             import redis
             
-            self.redis_client = redis.Redis(
+            # Shared blocking pool; each thread gets its own client view
+            self._redis = redis
+            self._pool = redis.BlockingConnectionPool(
                 host=self.redis_config.get("host", "localhost"),
                 port=self.redis_config.get("port", 6379),
                 db=self.redis_config.get("db", 0),
-                decode_responses=True
+                max_connections=self.redis_config.get("max_connections", 50)
             )
             
             # Test connection
@@ -79,7 +213,10 @@ class AgentCommunicationHub:
             print(f"Connected to Redis at {self.redis_config['host']}:{self.redis_config['port']}")
             
             # Initialize pubsub
-            self.pubsub = self.redis_client.pubsub()
+            self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            
+            # Server-side scripts (sent once, then run via EVALSHA)
+            self._cast_vote_script = self.redis_client.register_script(CAST_VOTE_LUA)
             
         except ImportError:
             print("Redis not installed. Install with: pip install redis")
@@ -89,6 +226,47 @@ class AgentCommunicationHub:
             print("Make sure Redis server is running: redis-server")
             raise
     
+    @property
+    def redis_client(self):
+        """Redis client for the calling thread, backed by the shared pool"""
+        if self._pool is None:
+            return None
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._redis.Redis(connection_pool=self._pool)
+            self._local.client = client
+        return client
+    
+    def _cache_identity(self):
+        """Precompute per-agent values used on every message"""
+        self._role_value = self.agent_role.value
+        self._heartbeat_key = f"agents:heartbeat:{self.agent_id}"
+    
+    def for_agent(self, agent_id: str, role: AgentRole) -> "AgentCommunicationHub":
+        """
+        Hub that acts as one agent over this hub's connection pool.
+        
+        Agents sharing a hub should each use their own view, so registering
+        one agent never changes the identity another sends or listens as.
+        Close the parent hub, not the views.
+        
+        Args:
+            agent_id: Unique agent identifier
+            role: Agent's role in the system
+        
+        Returns:
+            Hub view with its own identity
+        """
+        view = copy.copy(self)
+        view.agent_id = agent_id
+        view.agent_role = role
+        view._cache_identity()
+        view._message_writes = 0
+        view._conversation_writes = 0
+        view._registered_base = None
+        view._registered_meta = None
+        return view
+    
     def register_agent(self, agent_id: str, role: AgentRole, 
                       metadata: Optional[Dict] = None) -> bool:
         """
@@ -104,24 +282,33 @@ class AgentCommunicationHub:
         """
         self.agent_id = agent_id
         self.agent_role = role
+        self._cache_identity()
         
-        agent_data = {
-            "agent_id": agent_id,
-            "role": role.value,
-            "status": "active",
-            "registered_at": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
+        metadata = metadata or {}
+        pipe = self.redis_client.pipeline(transaction=False)
         
-        # Store agent in registry
-        self.redis_client.hset(
-            "agents:registry",
-            agent_id,
-            json.dumps(agent_data)
-        )
+        # Write the base record only when this hub has not yet stored it
+        # for this agent/role
+        if self._registered_base != (agent_id, role):
+            base_data = {
+                "agent_id": agent_id,
+                "role": role.value,
+                "status": "active",
+                "registered_at": _now_ns()
+            }
+            pipe.hset(REGISTRY_BASE, agent_id, _encode(base_data))
+            
+            # Add to role-based set
+            pipe.sadd(f"agents:role:{role.value}", agent_id)
+            self._registered_base = (agent_id, role)
+            self._registered_meta = None
         
-        # Add to role-based set
-        self.redis_client.sadd(f"agents:role:{role.value}", agent_id)
+        # Metadata is the delta: only written when it changed
+        if metadata != self._registered_meta:
+            pipe.hset(REGISTRY_META, agent_id, _encode(metadata))
+            self._registered_meta = copy.deepcopy(metadata)
+        
+        pipe.execute()
         
         # Set agent heartbeat
         self._update_heartbeat()
@@ -132,9 +319,9 @@ class AgentCommunicationHub:
     def _update_heartbeat(self):
         """Update agent heartbeat timestamp"""
         self.redis_client.setex(
-            f"agents:heartbeat:{self.agent_id}",
+            self._heartbeat_key,
             30,  # 30 second TTL
-            datetime.now().isoformat()
+            _HEARTBEAT.pack(_now_ns())
         )
     
     def send_message(self, message_type: MessageType, content: Any,
@@ -154,78 +341,118 @@ class AgentCommunicationHub:
         Returns:
             Message ID
         """
+        # Log, publish and track the message in a single round trip
+        pipe = self.redis_client.pipeline(transaction=False)
+        message_id = self._queue_message(
+            pipe, message_type, content,
+            recipient_id, recipient_role, requires_response
+        )
+        pipe.execute()
+        
+        return message_id
+    
+    def _queue_message(self, pipe, message_type: MessageType, content: Any,
+                       recipient_id: Optional[str],
+                       recipient_role: Optional[AgentRole],
+                       requires_response: bool) -> str:
+        """Queue the log/publish/pending commands for a message on a pipeline"""
         message_id = str(uuid.uuid4())
         
         message = {
             "message_id": message_id,
             "sender_id": self.agent_id,
-            "sender_role": self.agent_role.value,
+            "sender_role": self._role_value,
             "message_type": message_type.value,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_ns(),
             "requires_response": requires_response,
             "recipient_id": recipient_id,
             "recipient_role": recipient_role.value if recipient_role else None
         }
         
+        payload = _encode(message)
+        
         # Store message in log
-        self.redis_client.lpush(
-            "messages:log",
-            json.dumps(message)
-        )
+        pipe.lpush("messages:log", payload)
         
-        # Limit log size (keep last 10000 messages)
-        self.redis_client.ltrim("messages:log", 0, 9999)
+        # Limit log size (keep last 10000 messages), trimming periodically
+        if self._message_writes % LOG_TRIM_INTERVAL == 0:
+            pipe.ltrim("messages:log", 0, 9999)
+        self._message_writes += 1
         
-        # Publish message
-        if recipient_id:
-            # Direct message
-            channel = f"agent:{recipient_id}"
-            self.redis_client.publish(channel, json.dumps(message))
-        elif recipient_role:
-            # Role-based broadcast
-            channel = f"role:{recipient_role.value}"
-            self.redis_client.publish(channel, json.dumps(message))
-        else:
-            # Broadcast to all
-            self.redis_client.publish("agents:broadcast", json.dumps(message))
+        # Publish once on the event channel for this message type;
+        # recipients filter on recipient_id / recipient_role themselves
+        pipe.publish(CHANNELS[message_type], payload)
         
         # If requires response, add to pending responses
         if requires_response:
-            self.redis_client.setex(
+            pipe.setex(
                 f"messages:pending:{message_id}",
                 300,  # 5 minute timeout
-                json.dumps(message)
+                payload
             )
         
         return message_id
     
-    def subscribe_to_messages(self, callback: Callable[[Dict], None]):
+    def subscribe_to_messages(self, callback: Callable[[Dict], None],
+                              agent_id: Optional[str] = None,
+                              role: Optional[AgentRole] = None):
         """
         Subscribe to messages for this agent.
         
         Args:
             callback: Function to call when message received
+            agent_id: Agent to receive for (defaults to the hub's identity)
+            role: That agent's role (defaults to the hub's identity)
         """
-        # Subscribe to direct messages
-        self.pubsub.subscribe(f"agent:{self.agent_id}")
+        # One hub may register several agents; this subscription keeps the
+        # identity it was given, or the one current when it started
+        agent_id = agent_id or self.agent_id
+        role_value = role.value if role else self._role_value
         
-        # Subscribe to role-based messages
-        self.pubsub.subscribe(f"role:{self.agent_role.value}")
+        # Each subscriber reads its own pubsub connection so agents sharing
+        # the hub all see every message
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
         
-        # Subscribe to broadcasts
-        self.pubsub.subscribe("agents:broadcast")
+        # Subscribe to every event channel in one call
+        pubsub.subscribe(*set(CHANNELS.values()))
         
-        print(f"Agent {self.agent_id} listening for messages...")
+        print(f"Agent {agent_id} listening for messages...")
         
-        # Listen for messages
-        for message in self.pubsub.listen():
-            if message["type"] == "message":
+        # Poll for messages; subscribe confirmations are filtered by redis-py
+        try:
+            while not self._closed.is_set():
+                try:
+                    message = pubsub.get_message(timeout=1.0)
+                except Exception:
+                    # close() disconnects the pool under a pending read
+                    if self._closed.is_set():
+                        break
+                    raise
+                if message is None:
+                    continue
                 try:
-                    msg_data = json.loads(message["data"])
-                    callback(msg_data)
+                    msg_data = _decode(message["data"])
+                    if self._is_for_me(msg_data, agent_id, role_value):
+                        callback(msg_data)
                 except Exception as e:
                     print(f"Error processing message: {e}")
+        finally:
+            pubsub.close()
+    
+    def _is_for_me(self, message: Dict[str, Any],
+                   agent_id: Optional[str] = None,
+                   role_value: Optional[str] = None) -> bool:
+        """Whether a message on a shared channel is addressed to an agent
+        (defaults to the hub's current identity)"""
+        if message.get("recipient_id"):
+            # Direct message
+            return message["recipient_id"] == (agent_id or self.agent_id)
+        if message.get("recipient_role"):
+            # Role-based broadcast
+            return message["recipient_role"] == (role_value or self._role_value)
+        # Broadcast to all
+        return True
     
     def request_vote(self, proposal: str, options: List[str],
                     timeout: int = 60) -> Dict[str, Any]:
@@ -247,7 +474,7 @@ class AgentCommunicationHub:
             "proposal": proposal,
             "options": options,
             "initiated_by": self.agent_id,
-            "initiated_at": datetime.now().isoformat(),
+            "initiated_at": _now_ns(),
             "timeout": timeout
         }
         
@@ -255,7 +482,7 @@ class AgentCommunicationHub:
         self.redis_client.setex(
             f"votes:active:{vote_id}",
             timeout,
-            json.dumps(vote_data)
+            _encode(vote_data)
         )
         
         # Initialize vote counters
@@ -283,21 +510,24 @@ class AgentCommunicationHub:
         Returns:
             Success status
         """
-        # Check if vote exists
-        vote_data = self.redis_client.get(f"votes:active:{vote_id}")
-        if not vote_data:
+        # Check, record and mark the voter in one atomic round trip
+        status = self._cast_vote_script(
+            keys=[
+                f"votes:active:{vote_id}",
+                f"votes:voters:{vote_id}",
+                f"votes:results:{vote_id}"
+            ],
+            args=[self.agent_id, option],
+            client=self.redis_client
+        )
+        
+        if status == -1:
             print(f"Vote {vote_id} not found or expired")
             return False
-        
-        # Check if already voted
-        if self.redis_client.sismember(f"votes:voters:{vote_id}", self.agent_id):
+        if status == -2:
             print(f"Agent {self.agent_id} already voted")
             return False
         
-        # Cast vote
-        self.redis_client.hincrby(f"votes:results:{vote_id}", option, 1)
-        self.redis_client.sadd(f"votes:voters:{vote_id}", self.agent_id)
-        
         # Send vote cast message
         self.send_message(
             MessageType.VOTE_CAST,
@@ -324,7 +554,8 @@ class AgentCommunicationHub:
         voters = self.redis_client.smembers(f"votes:voters:{vote_id}")
         
         # Convert counts to integers
-        results = {k: int(v) for k, v in results.items()}
+        results = {k.decode(): int(v) for k, v in results.items()}
+        voters = [voter.decode() for voter in voters]
         
         # Determine winner
         winner = max(results.items(), key=lambda x: x[1])[0] if results else None
@@ -333,7 +564,7 @@ class AgentCommunicationHub:
             "vote_id": vote_id,
             "results": results,
             "total_votes": len(voters),
-            "voters": list(voters),
+            "voters": voters,
             "winner": winner
         }
     
@@ -373,14 +604,14 @@ class AgentCommunicationHub:
             "task_id": task_id,
             "task": task,
             "allocation_method": allocation_method,
-            "requested_at": datetime.now().isoformat()
+            "requested_at": _now_ns()
         }
         
         # Store task
         self.redis_client.setex(
             f"tasks:pending:{task_id}",
             300,
-            json.dumps(task_data)
+            _encode(task_data)
         )
         
         if allocation_method == "auction":
@@ -391,18 +622,59 @@ class AgentCommunicationHub:
                 recipient_role=AgentRole.PROBLEM_SOLVER
             )
             
-            # Wait for bids (simplified for now)
-            time.sleep(5)
-            
-            # Get bids
-            bids = self.redis_client.hgetall(f"tasks:bids:{task_id}")
+            # Block on the bid queue instead of sleeping out the whole window
+            bids = self._collect_bids(task_id)
             if bids:
                 # Select highest bidder (lowest cost)
-                winner = min(bids.items(), key=lambda x: float(x[1]))[0]
-                return winner
+                return min(bids.items(), key=lambda x: x[1])[0]
         
         return None
     
+    def submit_bid(self, task_id: str, cost: float,
+                   agent_id: Optional[str] = None):
+        """
+        Submit an agent's bid for an auctioned task.
+        
+        Args:
+            task_id: Task identifier
+            cost: Bid cost (lower wins)
+            agent_id: Bidding agent (defaults to the hub's registered agent;
+                agents sharing a hub must pass their own ID)
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.rpush(f"tasks:bids:{task_id}", f"{agent_id or self.agent_id}:{cost}")
+        pipe.expire(f"tasks:bids:{task_id}", 300)
+        pipe.execute()
+    
+    def _collect_bids(self, task_id: str) -> Dict[str, float]:
+        """
+        Pop bids for a task until the window closes or bidding goes quiet.
+        
+        Args:
+            task_id: Task identifier
+        
+        Returns:
+            Mapping of agent ID to its lowest bid
+        """
+        key = f"tasks:bids:{task_id}"
+        bids = {}
+        deadline = time.monotonic() + BID_WINDOW
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(remaining, BID_QUIET_PERIOD) if bids else remaining
+            popped = self.redis_client.blpop([key], timeout=max(0.01, timeout))
+            if popped is None:
+                if bids:
+                    break
+                continue
+            agent_id, _, cost = popped[1].decode().rpartition(":")
+            bids[agent_id] = min(float(cost), bids.get(agent_id, float("inf")))
+        
+        return bids
+    
     def log_conversation(self, conversation: Dict[str, Any]):
         """
         Log agent conversation for shared context.
@@ -412,18 +684,19 @@ class AgentCommunicationHub:
         """
         log_entry = {
             "agent_id": self.agent_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_ns(),
             "conversation": conversation
         }
         
         # Store in conversation log
-        self.redis_client.lpush(
-            "conversations:log",
-            json.dumps(log_entry)
-        )
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.lpush("conversations:log", _encode(log_entry))
         
-        # Limit log size
-        self.redis_client.ltrim("conversations:log", 0, 9999)
+        # Limit log size, trimming periodically
+        if self._conversation_writes % LOG_TRIM_INTERVAL == 0:
+            pipe.ltrim("conversations:log", 0, 9999)
+        self._conversation_writes += 1
+        pipe.execute()
         
         # Notify note-takers
         self.send_message(
@@ -443,31 +716,46 @@ class AgentCommunicationHub:
             Agent status information
         """
         if agent_id:
-            # Get specific agent
-            agent_data = self.redis_client.hget("agents:registry", agent_id)
-            heartbeat = self.redis_client.get(f"agents:heartbeat:{agent_id}")
+            # Get specific agent in one round trip
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hget(REGISTRY_BASE, agent_id)
+            pipe.hget(REGISTRY_META, agent_id)
+            pipe.get(f"agents:heartbeat:{agent_id}")
+            agent_data, metadata, heartbeat = pipe.execute()
             
             if agent_data:
-                agent_info = json.loads(agent_data)
-                agent_info["last_heartbeat"] = heartbeat
-                agent_info["is_alive"] = heartbeat is not None
-                return agent_info
+                return self._agent_info(agent_data, metadata, heartbeat)
         else:
-            # Get all agents
-            all_agents = self.redis_client.hgetall("agents:registry")
-            agents = {}
+            # Get all agents: registry in one round trip, heartbeats in one MGET
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hgetall(REGISTRY_BASE)
+            pipe.hgetall(REGISTRY_META)
+            all_agents, all_metadata = pipe.execute()
+            
+            if not all_agents:
+                return {}
             
-            for aid, data in all_agents.items():
-                agent_info = json.loads(data)
-                heartbeat = self.redis_client.get(f"agents:heartbeat:{aid}")
-                agent_info["last_heartbeat"] = heartbeat
-                agent_info["is_alive"] = heartbeat is not None
-                agents[aid] = agent_info
+            agent_ids = list(all_agents)
+            heartbeats = self.redis_client.mget(
+                [b"agents:heartbeat:" + aid for aid in agent_ids]
+            )
             
-            return agents
+            return {
+                aid.decode(): self._agent_info(all_agents[aid], all_metadata.get(aid), heartbeat)
+                for aid, heartbeat in zip(agent_ids, heartbeats)
+            }
         
         return {}
     
+    def _agent_info(self, base: bytes, metadata: Optional[bytes],
+                    heartbeat: Optional[bytes]) -> Dict[str, Any]:
+        """Merge an agent's base record, metadata and heartbeat."""
+        agent_info = _decode(base)
+        agent_info["metadata"] = _decode(metadata) if metadata else {}
+        agent_info["last_heartbeat"] = _unpack_heartbeat(heartbeat)
+        agent_info["is_alive"] = heartbeat is not None
+        return agent_info
+    
     def get_message_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Get message history from the log.
@@ -479,7 +767,7 @@ class AgentCommunicationHub:
             List of messages
         """
         messages = self.redis_client.lrange("messages:log", 0, limit - 1)
-        return [json.loads(msg) for msg in messages]
+        return _decode_batch(messages)
     
     def health_check(self) -> Dict[str, Any]:
         """
@@ -493,7 +781,7 @@ class AgentCommunicationHub:
             self.redis_client.ping()
             
             # Get agent counts
-            total_agents = self.redis_client.hlen("agents:registry")
+            total_agents = self.redis_client.hlen(REGISTRY_BASE)
             
             # Get message count
             message_count = self.redis_client.llen("messages:log")
@@ -503,14 +791,185 @@ class AgentCommunicationHub:
                 "redis_connected": True,
                 "total_agents": total_agents,
                 "message_count": message_count,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_ns()
             }
         except Exception as e:
             return {
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_ns()
             }
+    
+    def close(self):
+        """Close the pubsub and Redis connections"""
+        self._closed.set()
+        if self.pubsub is not None:
+            self.pubsub.close()
+            self.pubsub = None
+        if self._pool is not None:
+            self._pool.disconnect()
+            self._pool = None
+
+
+class AsyncAgentCommunicationHub:
+    """
+    asyncio variant of AgentCommunicationHub.
+    Lets many agents share one event loop; concurrent sends each go out as
+    a single pipelined write and the listener never blocks on callbacks.
+    """
+    
+    # Message framing and filtering are shared with the synchronous hub
+    _cache_identity = AgentCommunicationHub._cache_identity
+    _queue_message = AgentCommunicationHub._queue_message
+    _is_for_me = AgentCommunicationHub._is_for_me
+    
+    def __init__(self, redis_config: Optional[Dict] = None):
+        """
+        Initialize the async hub. Call ``await connect()`` before use.
+        
+        Args:
+            redis_config: Redis connection configuration
+        """
+        self.redis_config = redis_config or {
+            "host": "localhost",
+            "port": 6379,
+            "db": 0
+        }
+        self.redis_client = None
+        self.pubsub = None
+        self.agent_id = str(uuid.uuid4())
+        self.agent_role = AgentRole.PROBLEM_SOLVER
+        self._cache_identity()
+        self._message_writes = 0
+        self._callback_tasks = set()
+    
+    async def connect(self):
+        """Connect to Redis server"""
+        import redis.asyncio as aioredis
+        
+        pool = aioredis.BlockingConnectionPool(
+            host=self.redis_config.get("host", "localhost"),
+            port=self.redis_config.get("port", 6379),
+            db=self.redis_config.get("db", 0),
+            max_connections=self.redis_config.get("max_connections", 50)
+        )
+        self.redis_client = aioredis.Redis(connection_pool=pool)
+        await self.redis_client.ping()
+        self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        return self
+    
+    async def register_agent(self, agent_id: str, role: AgentRole,
+                             metadata: Optional[Dict] = None) -> bool:
+        """
+        Register an agent in the system.
+        
+        Args:
+            agent_id: Unique agent identifier
+            role: Agent's role in the system
+            metadata: Additional agent metadata
+        
+        Returns:
+            Success status
+        """
+        self.agent_id = agent_id
+        self.agent_role = role
+        self._cache_identity()
+        
+        base_data = {
+            "agent_id": agent_id,
+            "role": role.value,
+            "status": "active",
+            "registered_at": _now_ns()
+        }
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(REGISTRY_BASE, agent_id, _encode(base_data))
+        pipe.hset(REGISTRY_META, agent_id, _encode(metadata or {}))
+        pipe.sadd(f"agents:role:{role.value}", agent_id)
+        pipe.setex(self._heartbeat_key, 30, _HEARTBEAT.pack(_now_ns()))
+        await pipe.execute()
+        return True
+    
+    async def send_message(self, message_type: MessageType, content: Any,
+                           recipient_id: Optional[str] = None,
+                           recipient_role: Optional[AgentRole] = None,
+                           requires_response: bool = False) -> str:
+        """
+        Send a message to another agent or broadcast to role.
+        
+        Args:
+            message_type: Type of message
+            content: Message content
+            recipient_id: Specific agent ID (optional)
+            recipient_role: Target role for broadcast (optional)
+            requires_response: Whether this message requires a response
+        
+        Returns:
+            Message ID
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        message_id = self._queue_message(
+            pipe, message_type, content,
+            recipient_id, recipient_role, requires_response
+        )
+        await pipe.execute()
+        return message_id
+    
+    async def subscribe_to_messages(self, callback: Callable[[Dict], Any],
+                                    agent_id: Optional[str] = None,
+                                    role: Optional[AgentRole] = None):
+        """
+        Listen for messages for this agent until the hub is closed.
+        
+        Args:
+            callback: Function or coroutine function called per message;
+                coroutines run as tasks so the read loop keeps going
+            agent_id: Agent to receive for (defaults to the hub's identity
+                when the listener starts, so pass it when sharing the hub)
+            role: That agent's role (same default)
+        """
+        # Keep the identity given, or the one current when listening starts
+        agent_id = agent_id or self.agent_id
+        role_value = role.value if role else self._role_value
+        
+        # Each subscriber reads its own pubsub connection so agents sharing
+        # the hub all see every message
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(*set(CHANNELS.values()))
+        
+        try:
+            while self.pubsub is not None:
+                try:
+                    message = await pubsub.get_message(timeout=1.0)
+                except Exception:
+                    # close() disconnects the pool under a pending read
+                    if self.pubsub is None:
+                        break
+                    raise
+                if message is None:
+                    continue
+                try:
+                    msg_data = _decode(message["data"])
+                    if not self._is_for_me(msg_data, agent_id, role_value):
+                        continue
+                    result = callback(msg_data)
+                    if asyncio.iscoroutine(result):
+                        task = asyncio.create_task(result)
+                        self._callback_tasks.add(task)
+                        task.add_done_callback(self._callback_tasks.discard)
+                except Exception as e:
+                    print(f"Error processing message: {e}")
+        finally:
+            await pubsub.aclose()
+    
+    async def close(self):
+        """Close the pubsub and Redis connections"""
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
+        if self.redis_client is not None:
+            await self.redis_client.aclose(close_connection_pool=True)
+            self.redis_client = None
 
 
 if __name__ == "__main__":
@@ -556,16 +1015,16 @@ if __name__ == "__main__":
     elif action == "status":
         agent_id = sys.argv[2] if len(sys.argv) > 2 else None
         status = hub.get_agent_status(agent_id)
-        print(json.dumps(status, indent=2))
+        print(json.dumps(_for_display(status), indent=2))
     
     elif action == "history":
         limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
         history = hub.get_message_history(limit)
-        print(json.dumps(history, indent=2))
+        print(json.dumps(_for_display(history), indent=2))
     
     elif action == "health":
         health = hub.health_check()
-        print(json.dumps(health, indent=2))
+        print(json.dumps(_for_display(health), indent=2))
     
     else:
         print(f"Unknown action: {action}")
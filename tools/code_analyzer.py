@@ -4,29 +4,137 @@ import json
 import os
 import subprocess
 import hashlib
+import mmap
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Optional Cython line scanner (cythonize -i tools/_analyzer_native.pyx)
+try:
+    from _analyzer_native import scan as _native_scan
+except ImportError:
+    try:
+        from tools._analyzer_native import scan as _native_scan
+    except ImportError:
+        _native_scan = None
+
+# Files at least this large are hashed through mmap rather than read()
+MMAP_THRESHOLD = 64 * 1024
+
+# BLAKE3 when installed, otherwise SHA-256 (SHA-NI accelerated on modern CPUs)
+DEFAULT_HASH_ALGORITHM = "blake3" if blake3 is not None else "sha256"
+
+# Per-extension tables, built once at import
+SUPPORTED_EXTENSIONS = ('.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h', '.cs', '.go', '.rs')
+
+LANGUAGES = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.jsx': 'React',
+    '.tsx': 'React TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.h': 'C/C++ Header',
+    '.cs': 'C#',
+    '.go': 'Go',
+    '.rs': 'Rust'
+}
+
+_C_STYLE_COMMENTS = ('//', '/*')
+COMMENT_PREFIXES = {
+    '.py': ('#',),
+    '.js': _C_STYLE_COMMENTS,
+    '.ts': _C_STYLE_COMMENTS,
+    '.jsx': _C_STYLE_COMMENTS,
+    '.tsx': _C_STYLE_COMMENTS,
+    '.java': _C_STYLE_COMMENTS,
+    '.cpp': _C_STYLE_COMMENTS,
+    '.c': _C_STYLE_COMMENTS,
+    '.cs': _C_STYLE_COMMENTS,
+    '.go': _C_STYLE_COMMENTS
+}
+_COMMENT_PREFIX_BYTES = {
+    ext: tuple(prefix.encode() for prefix in prefixes)
+    for ext, prefixes in COMMENT_PREFIXES.items()
+}
+
+# Duplicate candidates are first compared on a hash of this many leading bytes;
+# files no larger than this are fully hashed by that first pass
+PREFIX_BYTES = 64 * 1024
+
+# Below this many candidates, hashing inline beats starting worker processes
+PARALLEL_HASH_THRESHOLD = 64
+
+def _hash_worker(job):
+    """Process-pool entry point: hash one path (or its first `limit` bytes),
+    returning None if unreadable"""
+    algorithm, file_path, limit = job
+    try:
+        analyzer = CodeAnalyzer(algorithm)
+        if limit is None:
+            return analyzer._hash_file(file_path)
+        with open(file_path, 'rb') as f:
+            return analyzer._hash_bytes(f.read(limit))
+    except Exception:
+        return None
+
 class CodeAnalyzer:
-    def __init__(self):
-        self.supported_extensions = {'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h', '.cs', '.go', '.rs'}
+    def __init__(self, hash_algorithm: Optional[str] = None):
+        self.supported_extensions = set(SUPPORTED_EXTENSIONS)
+        self.hash_algorithm = hash_algorithm or DEFAULT_HASH_ALGORITHM
+    
+    def _new_hasher(self):
+        if self.hash_algorithm == "blake3":
+            return blake3.blake3()
+        return hashlib.new(self.hash_algorithm)
+    
+    def _hash_bytes(self, data) -> str:
+        """Hash file contents, returning "algorithm:hexdigest" """
+        hasher = self._new_hasher()
+        hasher.update(data)
+        return f"{self.hash_algorithm}:{hasher.hexdigest()}"
+    
+    def _hash_file(self, file_path: str) -> str:
+        """Hash a file, streaming large ones through mmap instead of reading them"""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+                return self._hash_bytes(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self._hash_bytes(mm)
     
     def analyze_file(self, file_path: str) -> Dict[str, Any]:
         """Analyze a single file for code metrics"""
-        if not os.path.exists(file_path):
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
             return {"error": f"File {file_path} does not exist"}
         
+        return self._scan_file(file_path, st)
+    
+    def _scan_file(self, file_path: str, st: os.stat_result) -> Dict[str, Any]:
+        """Compute all metrics for one file in a single read and a single line pass"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            total_lines = len(lines)
-            non_empty_lines = len([line for line in lines if line.strip()])
-            comment_lines = self._count_comments(content, file_path)
-            
+            # Read once: the same bytes feed the hash and the line metrics
             with open(file_path, 'rb') as f:
-                content_hash = hashlib.md5(f.read()).hexdigest()
+                data = f.read()
+            content_hash = self._hash_bytes(data)
+            content = data.decode('utf-8')
+            
+            ext = os.path.splitext(file_path)[1]
+            if _native_scan is not None:
+                total_lines, non_empty_lines, comment_lines = _native_scan(
+                    data, _COMMENT_PREFIX_BYTES.get(ext, ()))
+            else:
+                total_lines, non_empty_lines, comment_lines = self._line_stats(
+                    content, COMMENT_PREFIXES.get(ext))
             
             return {
                 "file_path": file_path,
@@ -34,101 +142,135 @@ class CodeAnalyzer:
                 "non_empty_lines": non_empty_lines,
                 "comment_lines": comment_lines,
                 "content_hash": content_hash,
-                "file_size": os.path.getsize(file_path),
-                "last_modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-                "language": self._detect_language(file_path)
+                "file_size": st.st_size,
+                "last_modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "language": LANGUAGES.get(ext, 'Unknown')
             }
         except Exception as e:
             return {"error": f"Error analyzing {file_path}: {str(e)}"}
     
-    def analyze_directory(self, directory: str, recursive: bool = True) -> List[Dict[str, Any]]:
-        """Analyze all supported files in a directory"""
-        results = []
+    def _line_stats(self, content: str, comment_prefixes: Optional[tuple]) -> tuple:
+        """Pure-Python (total, non-empty, comment) line counts in one pass"""
+        lines = content.split('\n')
+        non_empty_lines = 0
+        comment_lines = 0
+        for line in lines:
+            stripped = line.strip()
+            if stripped:
+                non_empty_lines += 1
+                if comment_prefixes and stripped.startswith(comment_prefixes):
+                    comment_lines += 1
+        return len(lines), non_empty_lines, comment_lines
+    
+    def _iter_source_files(self, directory: str, recursive: bool = True, extensions: Optional[tuple] = None):
+        """Yield DirEntry objects for supported files, walking with os.scandir"""
+        if extensions is None:
+            extensions = tuple(self.supported_extensions)
+        subdirs = []
         
-        if recursive:
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    if any(file.endswith(ext) for ext in self.supported_extensions):
-                        file_path = os.path.join(root, file)
-                        results.append(self.analyze_file(file_path))
-        else:
-            for file in os.listdir(directory):
-                if any(file.endswith(ext) for ext in self.supported_extensions):
-                    file_path = os.path.join(directory, file)
-                    results.append(self.analyze_file(file_path))
+        # Unreadable or missing directories are skipped, as os.walk does
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            return
         
-        return results
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    yield entry
+        
+        # Files before subdirectories, matching os.walk's top-down order
+        if recursive:
+            for subdir in subdirs:
+                yield from self._iter_source_files(subdir, recursive, extensions)
+    
+    def analyze_directory(self, directory: str, recursive: bool = True) -> List[Dict[str, Any]]:
+        """Analyze all supported files in a directory"""
+        return [
+            self._scan_file(entry.path, entry.stat())
+            for entry in self._iter_source_files(directory, recursive)
+        ]
     
     def _count_comments(self, content: str, file_path: str) -> int:
         """Count comment lines based on file type"""
-        ext = os.path.splitext(file_path)[1]
-        
-        if ext in {'.py'}:
-            lines = content.split('\n')
-            return sum(1 for line in lines if line.strip().startswith('#'))
-        elif ext in {'.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.go'}:
-            lines = content.split('\n')
-            return sum(1 for line in lines if line.strip().startswith('//') or line.strip().startswith('/*'))
-        else:
+        prefixes = COMMENT_PREFIXES.get(os.path.splitext(file_path)[1])
+        if not prefixes:
             return 0
+        return sum(1 for line in content.split('\n') if line.strip().startswith(prefixes))
     
     def _detect_language(self, file_path: str) -> str:
         """Detect programming language based on file extension"""
-        ext = os.path.splitext(file_path)[1]
-        language_map = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.jsx': 'React',
-            '.tsx': 'React TypeScript',
-            '.java': 'Java',
-            '.cpp': 'C++',
-            '.c': 'C',
-            '.h': 'C/C++ Header',
-            '.cs': 'C#',
-            '.go': 'Go',
-            '.rs': 'Rust'
-        }
-        return language_map.get(ext, 'Unknown')
-    
-    def find_duplicates(self, directory: str) -> List[Dict[str, Any]]:
+        return LANGUAGES.get(os.path.splitext(file_path)[1], 'Unknown')
+    
+    def _hash_paths(self, paths: List[str], limit: Optional[int],
+                    max_workers: Optional[int]) -> List[Optional[str]]:
+        """Hash paths inline, or across processes for big batches"""
+        jobs = [(self.hash_algorithm, path, limit) for path in paths]
+        if len(jobs) < PARALLEL_HASH_THRESHOLD:
+            return [_hash_worker(job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(_hash_worker, jobs, chunksize=64))
+    
+    def _refine(self, groups: Dict[Any, List[str]], limit: Optional[int],
+                max_workers: Optional[int]) -> Dict[tuple, List[str]]:
+        """Split each candidate group by hash, keeping sub-groups of 2+ files"""
+        keys = [key for key, paths in groups.items() for _ in paths]
+        paths = [path for group in groups.values() for path in group]
+        refined = defaultdict(list)
+        for key, path, digest in zip(keys, paths, self._hash_paths(paths, limit, max_workers)):
+            if digest is not None:
+                refined[(key, digest)].append(path)
+        return {key: group for key, group in refined.items() if len(group) > 1}
+    
+    def find_duplicates(self, directory: str, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """Find duplicate files based on content hash"""
-        file_hashes = {}
-        duplicates = []
+        # Stage 1: bucket by size; a file with a unique size has no duplicate
+        by_size = defaultdict(list)
+        for entry in self._iter_source_files(directory):
+            try:
+                by_size[entry.stat().st_size].append(entry.path)
+            except OSError:
+                continue
+        
+        candidates = {size: paths for size, paths in by_size.items() if len(paths) > 1}
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if any(file.endswith(ext) for ext in self.supported_extensions):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'rb') as f:
-                            content_hash = hashlib.md5(f.read()).hexdigest()
-                        
-                        if content_hash in file_hashes:
-                            duplicates.append({
-                                "hash": content_hash,
-                                "files": [file_hashes[content_hash], file_path]
-                            })
-                        else:
-                            file_hashes[content_hash] = file_path
-                    except Exception:
-                        continue
+        # Stage 2: hash the first PREFIX_BYTES of each size-colliding file;
+        # for files no larger than that, this is already the full hash
+        groups = {}
+        large = {}
+        for (size, digest), paths in self._refine(candidates, PREFIX_BYTES, max_workers).items():
+            if size <= PREFIX_BYTES:
+                groups[digest] = paths
+            else:
+                # Keep the size in the key: equal prefixes can head files
+                # of different sizes
+                large[(size, digest)] = paths
         
-        return duplicates
+        # Stage 3: full hash only where size and prefix both collide
+        for (_, digest), paths in self._refine(large, None, max_workers).items():
+            groups[digest] = paths
+        
+        # One entry per distinct content, listing every copy
+        return [{"hash": digest, "files": paths} for digest, paths in groups.items()]
 
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) < 3:
-        print("Usage: python code_analyzer.py <action> <path> [recursive]")
+    args = [arg for arg in sys.argv[1:] if arg != "--legacy-md5"]
+    legacy_md5 = len(args) != len(sys.argv) - 1
+    
+    if len(args) < 2:
+        print("Usage: python code_analyzer.py <action> <path> [recursive] [--legacy-md5]")
         print("Actions: analyze_file, analyze_directory, find_duplicates")
         sys.exit(1)
     
-    action = sys.argv[1]
-    path = sys.argv[2]
-    recursive = sys.argv[3].lower() == 'true' if len(sys.argv) > 3 else True
+    action = args[0]
+    path = args[1]
+    recursive = args[2].lower() == 'true' if len(args) > 2 else True
     
-    analyzer = CodeAnalyzer()
+    analyzer = CodeAnalyzer(hash_algorithm="md5" if legacy_md5 else None)
     
     if action == "analyze_file":
         result = analyzer.analyze_file(path)
@@ -3,11 +3,46 @@
 import urllib.request
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def fetch_data(url, headers=None):
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# One pooled keep-alive session per process, so repeat fetches to a host
+# reuse the TCP/TLS connection instead of handshaking every time
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+def _parse_json(body):
+    if msgspec is not None:
+        return msgspec.json.decode(body)
+    return json.loads(body)
+
+def fetch_data(url, headers=None, timeout=30.0):
+    if requests is not None:
+        response = _get_session().get(url, headers=headers or {}, timeout=timeout)
+        response.raise_for_status()
+        return _parse_json(response.content)
     req = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read().decode())
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return _parse_json(response.read())
+
+def fetch_many(urls, headers=None, max_workers=8):
+    """Fetch several URLs concurrently over the shared session"""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda url: fetch_data(url, headers), urls))
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -19,4 +54,4 @@ if __name__ == "__main__":
         data = fetch_data(url, headers)
         print(json.dumps(data, indent=2))
     except Exception as e:
-        print(f"Error fetching data: {e}")
\ No newline at end of file
+        print(f"Error fetching data: {e}")
@@ -1,17 +1,60 @@
 #!/usr/bin/env python3
 
 import json
+import mmap
+import os
 import sys
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+class _NeedsJsonModule(Exception):
+    """Input whose json.load/json.dump round trip msgspec cannot reproduce"""
+
+def _reject_float(text):
+    # msgspec spells floats differently from float.__repr__ (1e-7 vs 1e-07)
+    raise _NeedsJsonModule(text)
+
+_decoder = msgspec.json.Decoder(float_hook=_reject_float) if msgspec is not None else None
+
+def _format_mapped(input_file):
+    """Indented JSON bytes via msgspec, or None where json.dump's output
+    (or json.load's error) would differ"""
+    if msgspec is None or os.path.getsize(input_file) == 0:
+        return None
+    # Decode the mapped bytes and re-encode them in C; decoding keeps the
+    # last of duplicate keys and normalizes escapes, as json.load does
+    with open(input_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                data = _decoder.decode(mm)
+            except (msgspec.DecodeError, _NeedsJsonModule):
+                # Floats, NaN/Infinity and malformed input (whose
+                # JSONDecodeError json.load raises) take the json path
+                return None
+    formatted = msgspec.json.format(msgspec.json.encode(data), indent=2)
+    # json.dump escapes everything outside printable ASCII (DEL included);
+    # msgspec keeps non-ASCII characters and DEL as is
+    if not formatted.isascii() or b'\x7f' in formatted:
+        return None
+    return formatted
+
 def convert_json(input_file, output_file):
-    with open(input_file, 'r') as f:
-        data = json.load(f)
-    with open(output_file, 'w') as f:
-        json.dump(data, f, indent=2)
+    formatted = _format_mapped(input_file)
+    if formatted is not None:
+        with open(output_file, 'wb') as f:
+            f.write(formatted)
+    else:
+        with open(input_file, 'r') as f:
+            data = json.load(f)
+        with open(output_file, 'w') as f:
+            json.dump(data, f, indent=2)
     print(f"Converted {input_file} to formatted JSON in {output_file}")
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
         print("Usage: python format_converter.py <input_file> <output_file>")
         sys.exit(1)
-    convert_json(sys.argv[1], sys.argv[2])
\ No newline at end of file
+    convert_json(sys.argv[1], sys.argv[2])
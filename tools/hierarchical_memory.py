@@ -1,144 +1,369 @@
 #!/usr/bin/env python3
 
 import json
+import re
 import sqlite3
 import os
+import queue
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+# auto_organize_memory tags, checked in order; the first match wins
+AUTO_TAG_KEYWORDS = (
+    ("debugging", ('error', 'bug', 'fix')),
+    ("testing", ('test', 'spec', 'assert')),
+    ("deployment", ('deploy', 'production', 'release')),
+    ("api", ('api', 'endpoint', 'request')),
+)
+
+# One compiled classifier for AUTO_TAG_KEYWORDS: each branch is a lookahead
+# over the whole text, tried in rule order, so the first matching rule wins
+# (not the leftmost keyword) and lastgroup names the tag. Keywords match
+# anywhere in the text, case-insensitively, like the trigram FTS queries
+AUTO_TAG_PATTERN = re.compile(
+    r'\A(?:' + '|'.join(
+        f"(?=.*?(?:{'|'.join(map(re.escape, keywords))}))(?P<{tag_name}>)"
+        for tag_name, keywords in AUTO_TAG_KEYWORDS
+    ) + ')',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Read-only connections opened alongside the writer; WAL lets them read
+# concurrently with each other and with the one writer
+READER_POOL_SIZE = 4
+
+def _new_node_id() -> str:
+    """UUIDv7-style id: millisecond time prefix, so new nodes append at the
+    tail of the primary key B-tree instead of random insertion points"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return str(uuid.UUID(int=value))
+
+# The same rules as FTS5 queries over the trigram index: any keyword as a
+# case-insensitive substring (keywords need at least three characters)
+AUTO_TAG_QUERIES = tuple(
+    (tag_name, ' OR '.join(f'"{keyword}"' for keyword in keywords))
+    for tag_name, keywords in AUTO_TAG_KEYWORDS
+)
+
+def _load_metadata(text: Optional[str]) -> Dict[str, Any]:
+    """Parse a metadata column, skipping the JSON parser for empty objects"""
+    if not text or text == '{}':
+        return {}
+    return json.loads(text)
+
 class HierarchicalMemoryManager:
+    # Hot statements, kept as single strings so the connection's statement
+    # cache reuses their compiled programs
+    _SQL_CREATE_NODE = (
+        'INSERT INTO memory_nodes (id, parent_id, node_type, title, content, metadata, weight) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)'
+    )
+    _SQL_CREATE_RELATIONSHIP = (
+        'INSERT INTO node_relationships (id, source_id, target_id, relationship_type, strength, metadata) '
+        'VALUES (?, ?, ?, ?, ?, ?)'
+    )
+    # memory_nodes schema, also used to rebuild databases from before seq
+    _SQL_NODES_TABLE = '''
+        CREATE TABLE IF NOT EXISTS {name} (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            parent_id TEXT,
+            node_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            content TEXT,
+            metadata TEXT,
+            weight REAL DEFAULT 1.0,
+            access_count INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (parent_id) REFERENCES memory_nodes(id) ON DELETE CASCADE
+        )
+    '''
+    _SQL_UPSERT_TAG = 'INSERT INTO tags (id, name) VALUES (?, ?) ON CONFLICT(name) DO NOTHING'
+    _SQL_TAG_NODE = (
+        'INSERT OR REPLACE INTO node_tags (node_id, tag_id, confidence, tag_name) '
+        'SELECT ?, id, ?, name FROM tags WHERE name = ?'
+    )
+    _SQL_TAG_NODE_BY_ID = (
+        'INSERT OR REPLACE INTO node_tags (node_id, tag_id, confidence, tag_name) '
+        'VALUES (?, ?, ?, ?)'
+    )
+    
     def __init__(self, db_path: str = "hierarchical_memory.db"):
         self.db_path = db_path
+        # One autocommit connection per manager, shared by every call
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        self._lock = threading.RLock()
+        # Resolved on first use by _get_concepts_root
+        self._concepts_root_id: Optional[str] = None
         self.init_database()
+        
+        # Pool of read-only connections for the query methods; an in-memory
+        # database cannot be shared, so it reads through the writer instead
+        self._readers = queue.Queue()
+        if db_path != ":memory:":
+            for _ in range(READER_POOL_SIZE):
+                reader = sqlite3.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False, cached_statements=256)
+                reader.executescript('''
+                    PRAGMA temp_store=MEMORY;
+                    PRAGMA mmap_size=268435456;
+                    PRAGMA cache_size=-32000;
+                ''')
+                self._readers.put(reader)
+    
+    @contextmanager
+    def _cursor(self):
+        """Cursor on the shared connection, held under the manager lock"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def _read_cursor(self):
+        """Row-producing cursor on a pooled read-only connection, or on the
+        writer's connection without a pool"""
+        if self.db_path == ":memory:":
+            with self._cursor() as cursor:
+                cursor.row_factory = sqlite3.Row
+                yield cursor
+            return
+        reader = self._readers.get()
+        try:
+            cursor = reader.cursor()
+            cursor.row_factory = sqlite3.Row
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        finally:
+            self._readers.put(reader)
+    
+    @contextmanager
+    def _transaction(self, cursor: sqlite3.Cursor):
+        """Run the enclosed statements in one write transaction"""
+        if self._conn.in_transaction:
+            yield
+            return
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+    
+    def close(self):
+        """Close the shared database connection and the reader pool"""
+        with self._lock:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._conn.close()
     
     def init_database(self):
         """Initialize hierarchical SQLite database for memory storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Hierarchical memory nodes table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS memory_nodes (
-                id TEXT PRIMARY KEY,
-                parent_id TEXT,
-                node_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                content TEXT,
-                metadata TEXT,
-                weight REAL DEFAULT 1.0,
-                access_count INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (parent_id) REFERENCES memory_nodes(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Node relationships for complex hierarchies
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS node_relationships (
-                id TEXT PRIMARY KEY,
-                source_id TEXT NOT NULL,
-                target_id TEXT NOT NULL,
-                relationship_type TEXT NOT NULL,
-                strength REAL DEFAULT 1.0,
-                metadata TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (source_id) REFERENCES memory_nodes(id) ON DELETE CASCADE,
-                FOREIGN KEY (target_id) REFERENCES memory_nodes(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Tags for categorization
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tags (
-                id TEXT PRIMARY KEY,
-                name TEXT UNIQUE NOT NULL,
-                color TEXT DEFAULT '#007acc',
-                description TEXT
-            )
-        ''')
-        
-        # Node-tag relationships
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS node_tags (
-                node_id TEXT NOT NULL,
-                tag_id TEXT NOT NULL,
-                confidence REAL DEFAULT 1.0,
-                PRIMARY KEY (node_id, tag_id),
-                FOREIGN KEY (node_id) REFERENCES memory_nodes(id) ON DELETE CASCADE,
-                FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Sessions for conversation tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                id TEXT PRIMARY KEY,
-                root_node_id TEXT,
-                title TEXT,
-                metadata TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                last_active DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (root_node_id) REFERENCES memory_nodes(id) ON DELETE SET NULL
-            )
-        ''')
-        
-        # Create indexes for performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_parent ON memory_nodes(parent_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_type ON memory_nodes(node_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_weight ON memory_nodes(weight)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_relationships_source ON node_relationships(source_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_relationships_target ON node_relationships(target_id)')
-        
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            # Connection-wide settings, applied once
+            cursor.executescript('''
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_size=-32000;
+            ''')
+            
+            # Hierarchical memory nodes table; seq is an INTEGER PRIMARY KEY
+            # so the full-text index's rowids stay valid across VACUUM
+            cursor.execute('PRAGMA table_info(memory_nodes)')
+            node_columns = [row[1] for row in cursor.fetchall()]
+            if node_columns and 'seq' not in node_columns:
+                # Rebuild databases created before seq existed; the old
+                # index was keyed by the implicit rowid and is recreated below
+                columns = ', '.join(node_columns)
+                with self._transaction(cursor):
+                    cursor.execute('DROP TABLE IF EXISTS memory_nodes_fts')
+                    cursor.execute(self._SQL_NODES_TABLE.format(name='memory_nodes_new'))
+                    cursor.execute(f'INSERT INTO memory_nodes_new ({columns}) '
+                                   f'SELECT {columns} FROM memory_nodes ORDER BY rowid')
+                    cursor.execute('DROP TABLE memory_nodes')
+                    cursor.execute('ALTER TABLE memory_nodes_new RENAME TO memory_nodes')
+            cursor.execute(self._SQL_NODES_TABLE.format(name='memory_nodes'))
+            
+            # Node relationships for complex hierarchies
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS node_relationships (
+                    id TEXT PRIMARY KEY,
+                    source_id TEXT NOT NULL,
+                    target_id TEXT NOT NULL,
+                    relationship_type TEXT NOT NULL,
+                    strength REAL DEFAULT 1.0,
+                    metadata TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (source_id) REFERENCES memory_nodes(id) ON DELETE CASCADE,
+                    FOREIGN KEY (target_id) REFERENCES memory_nodes(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # Tags for categorization
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tags (
+                    id TEXT PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL,
+                    color TEXT DEFAULT '#007acc',
+                    description TEXT
+                )
+            ''')
+            
+            # Node-tag relationships
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS node_tags (
+                    node_id TEXT NOT NULL,
+                    tag_id TEXT NOT NULL,
+                    confidence REAL DEFAULT 1.0,
+                    tag_name TEXT,
+                    PRIMARY KEY (node_id, tag_id),
+                    FOREIGN KEY (node_id) REFERENCES memory_nodes(id) ON DELETE CASCADE,
+                    FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # Tag names are cached on node_tags so tag searches skip the tags
+            # table; backfill databases created before the column existed
+            cursor.execute('PRAGMA table_info(node_tags)')
+            if 'tag_name' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE node_tags ADD COLUMN tag_name TEXT')
+                cursor.execute('''
+                    UPDATE node_tags SET tag_name = (SELECT name FROM tags WHERE tags.id = node_tags.tag_id)
+                ''')
+            
+            # Keep the cached names in step with tag renames
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_tags_rename AFTER UPDATE OF name ON tags
+                BEGIN
+                    UPDATE node_tags SET tag_name = NEW.name WHERE tag_id = NEW.id;
+                END
+            ''')
+            
+            # Full-text index over node content, kept in step by triggers and
+            # used by auto_organize_memory when SQLite is built with FTS5
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'memory_nodes_fts'")
+            fts_existed = cursor.fetchone() is not None
+            try:
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS memory_nodes_fts
+                    USING fts5(content, content='memory_nodes', content_rowid='seq', tokenize='trigram')
+                ''')
+            except sqlite3.OperationalError:
+                self._has_fts = False
+            else:
+                self._has_fts = True
+                cursor.executescript('''
+                    CREATE TRIGGER IF NOT EXISTS trg_nodes_fts_insert AFTER INSERT ON memory_nodes
+                    BEGIN
+                        INSERT INTO memory_nodes_fts (rowid, content) VALUES (NEW.seq, NEW.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS trg_nodes_fts_delete AFTER DELETE ON memory_nodes
+                    BEGIN
+                        INSERT INTO memory_nodes_fts (memory_nodes_fts, rowid, content)
+                        VALUES ('delete', OLD.seq, OLD.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS trg_nodes_fts_update AFTER UPDATE OF content ON memory_nodes
+                    BEGIN
+                        INSERT INTO memory_nodes_fts (memory_nodes_fts, rowid, content)
+                        VALUES ('delete', OLD.seq, OLD.content);
+                        INSERT INTO memory_nodes_fts (rowid, content) VALUES (NEW.seq, NEW.content);
+                    END;
+                ''')
+                if not fts_existed:
+                    cursor.execute("INSERT INTO memory_nodes_fts (memory_nodes_fts) VALUES ('rebuild')")
+            
+            # Sessions for conversation tracking
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    root_node_id TEXT,
+                    title TEXT,
+                    metadata TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    last_active DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (root_node_id) REFERENCES memory_nodes(id) ON DELETE SET NULL
+                )
+            ''')
+            
+            # Create indexes for performance
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_type ON memory_nodes(node_type)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_weight ON memory_nodes(weight)')
+            
+            # Compound/covering indexes matching the query shapes: children in
+            # display order, tag lookups by confidence, relationships from
+            # either end without touching the table
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_nodes_parent_order ON memory_nodes(parent_id, weight DESC, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_node_tags_tag_conf ON node_tags(tag_id, confidence DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_node_tags_name ON node_tags(tag_name, confidence DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_rel_source_cover ON node_relationships(source_id, relationship_type, target_id, strength)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_rel_target_cover ON node_relationships(target_id, relationship_type, source_id, strength)')
+            
+            # Superseded by the compound indexes above (same leading column)
+            cursor.execute('DROP INDEX IF EXISTS idx_nodes_parent')
+            cursor.execute('DROP INDEX IF EXISTS idx_relationships_source')
+            cursor.execute('DROP INDEX IF EXISTS idx_relationships_target')
+            
+            # Refresh planner statistics where they are stale
+            cursor.execute('PRAGMA optimize')
     
     def create_node(self, node_type: str, title: str, content: str = "", 
                    parent_id: Optional[str] = None, metadata: Optional[Dict] = None,
                    weight: float = 1.0) -> str:
         """Create a new memory node"""
-        node_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO memory_nodes (id, parent_id, node_type, title, content, metadata, weight)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (node_id, parent_id, node_type, title, content, json.dumps(metadata or {}), weight))
+        node_id = _new_node_id()
+        with self._cursor() as cursor:
+            cursor.execute(self._SQL_CREATE_NODE, (node_id, parent_id, node_type, title, content, json.dumps(metadata or {}), weight))
         
-        conn.commit()
-        conn.close()
         return node_id
     
+    def create_nodes_bulk(self, rows: List[tuple]) -> List[str]:
+        """Create many nodes from (node_type, title, content, parent_id, metadata, weight) rows"""
+        node_ids = [_new_node_id() for _ in rows]
+        with self._cursor() as cursor, self._transaction(cursor):
+            cursor.executemany(self._SQL_CREATE_NODE, [
+                (node_id, parent_id, node_type, title, content, json.dumps(metadata or {}), weight)
+                for node_id, (node_type, title, content, parent_id, metadata, weight)
+                in zip(node_ids, rows)
+            ])
+        return node_ids
+    
     def create_session(self, title: str, metadata: Optional[Dict] = None) -> str:
         """Create a new session with root node"""
         session_id = str(uuid.uuid4())
         root_node_id = self.create_node("session_root", f"Session: {title}", 
                                        metadata=metadata, weight=2.0)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO sessions (id, root_node_id, title, metadata)
-            VALUES (?, ?, ?, ?)
-        ''', (session_id, root_node_id, title, json.dumps(metadata or {})))
+        with self._cursor() as cursor:
+            cursor.execute('''
+                INSERT INTO sessions (id, root_node_id, title, metadata)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, root_node_id, title, json.dumps(metadata or {})))
         
-        conn.commit()
-        conn.close()
         return session_id
     
     def add_conversation_turn(self, session_id: str, role: str, content: str, 
                            metadata: Optional[Dict] = None) -> str:
         """Add conversation turn to session"""
         # Get session root node
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT root_node_id FROM sessions WHERE id = ?', (session_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('SELECT root_node_id FROM sessions WHERE id = ?', (session_id,))
+            result = cursor.fetchone()
         
         if not result:
             raise ValueError(f"Session {session_id} not found")
@@ -159,240 +384,241 @@ class HierarchicalMemoryManager:
                           parent_concepts: Optional[List[str]] = None,
                           tags: Optional[List[str]] = None) -> str:
         """Create a concept node with hierarchical relationships"""
-        # Find or create parent concept node
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM memory_nodes WHERE node_type = "concepts_root"')
-        result = cursor.fetchone()
-        
-        if result:
-            concepts_root_id = result[0]
-        else:
-            concepts_root_id = self.create_node("concepts_root", "Concepts Root", 
-                                             weight=3.0)
-        
-        conn.close()
+        concepts_root_id = self._get_concepts_root()
         
-        # Create concept node
-        metadata = {"definition": definition, "type": "concept"}
-        node_id = self.create_node("concept", concept, definition, concepts_root_id, metadata)
-        
-        # Create relationships to parent concepts
-        if parent_concepts:
-            for parent in parent_concepts:
-                self.create_relationship(node_id, parent, "is_a", 0.8)
-        
-        # Add tags
-        if tags:
-            for tag in tags:
-                self.add_tag_to_node(node_id, tag)
+        # Create the concept, its parent links and its tags in one transaction
+        with self._cursor() as cursor, self._transaction(cursor):
+            metadata = {"definition": definition, "type": "concept"}
+            node_id = self.create_node("concept", concept, definition, concepts_root_id, metadata)
+            
+            if parent_concepts:
+                self.create_relationships_bulk(
+                    [(node_id, parent, "is_a", 0.8, None) for parent in parent_concepts]
+                )
+            
+            if tags:
+                self.add_tags_to_node(node_id, tags)
         
         return node_id
     
+    def _get_concepts_root(self) -> str:
+        """Find or create the concepts root node, caching its id"""
+        with self._lock:
+            if self._concepts_root_id is None:
+                with self._cursor() as cursor:
+                    cursor.execute("SELECT id FROM memory_nodes WHERE node_type = 'concepts_root'")
+                    result = cursor.fetchone()
+                
+                if result:
+                    self._concepts_root_id = result[0]
+                else:
+                    self._concepts_root_id = self.create_node("concepts_root", "Concepts Root", 
+                                                              weight=3.0)
+            return self._concepts_root_id
+    
     def create_relationship(self, source_id: str, target_id: str, 
                           relationship_type: str, strength: float = 1.0,
                           metadata: Optional[Dict] = None):
         """Create relationship between nodes"""
         relationship_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO node_relationships (id, source_id, target_id, relationship_type, strength, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (relationship_id, source_id, target_id, relationship_type, strength, json.dumps(metadata or {})))
+        with self._cursor() as cursor:
+            cursor.execute(self._SQL_CREATE_RELATIONSHIP, (relationship_id, source_id, target_id, relationship_type, strength, json.dumps(metadata or {})))
+    
+    def create_relationships_bulk(self, rows: List[tuple]) -> List[str]:
+        """Create many relationships from (source_id, target_id, type, strength, metadata) rows"""
+        relationship_ids = [str(uuid.uuid4()) for _ in rows]
+        with self._cursor() as cursor, self._transaction(cursor):
+            cursor.executemany(self._SQL_CREATE_RELATIONSHIP, [
+                (relationship_id, source_id, target_id, relationship_type, strength, json.dumps(metadata or {}))
+                for relationship_id, (source_id, target_id, relationship_type, strength, metadata)
+                in zip(relationship_ids, rows)
+            ])
+        return relationship_ids
+    
+    def delete_subtree(self, node_id: str) -> int:
+        """Delete a node, its descendants and everything attached to them"""
+        # The subtree is resolved once into a temp table, then each dependent
+        # table is purged with one set-based DELETE instead of per-row
+        # cascades (foreign keys are not enforced on this connection anyway)
+        with self._cursor() as cursor, self._transaction(cursor):
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS doomed_nodes (id TEXT PRIMARY KEY)')
+            cursor.execute('DELETE FROM doomed_nodes')
+            cursor.execute('''
+                INSERT INTO doomed_nodes (id)
+                WITH RECURSIVE subtree(id) AS (
+                    SELECT id FROM memory_nodes WHERE id = ?
+                    UNION
+                    SELECT n.id FROM memory_nodes n JOIN subtree s ON n.parent_id = s.id
+                )
+                SELECT id FROM subtree
+            ''', (node_id,))
+            
+            cursor.execute('DELETE FROM node_relationships WHERE source_id IN (SELECT id FROM doomed_nodes)')
+            cursor.execute('DELETE FROM node_relationships WHERE target_id IN (SELECT id FROM doomed_nodes)')
+            cursor.execute('DELETE FROM node_tags WHERE node_id IN (SELECT id FROM doomed_nodes)')
+            cursor.execute('UPDATE sessions SET root_node_id = NULL WHERE root_node_id IN (SELECT id FROM doomed_nodes)')
+            cursor.execute('DELETE FROM memory_nodes WHERE id IN (SELECT id FROM doomed_nodes)')
+            deleted = cursor.rowcount
+            
+            if self._concepts_root_id is not None:
+                cursor.execute('SELECT 1 FROM doomed_nodes WHERE id = ?', (self._concepts_root_id,))
+                if cursor.fetchone():
+                    self._concepts_root_id = None
+            cursor.execute('DELETE FROM doomed_nodes')
         
-        conn.commit()
-        conn.close()
+        return deleted
     
     def get_node_hierarchy(self, node_id: str, max_depth: int = 5) -> Dict[str, Any]:
         """Get hierarchical tree starting from node"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if max_depth <= 0:
+            return {}
         
-        def build_tree(current_id: str, depth: int = 0) -> Dict[str, Any]:
-            if depth >= max_depth:
-                return {}
-            
+        # Whole subtree in one query, parents before children and siblings
+        # in display order
+        with self._read_cursor() as cursor:
             cursor.execute('''
-                SELECT id, node_type, title, content, metadata, weight, access_count
-                FROM memory_nodes WHERE id = ?
-            ''', (current_id,))
-            
-            node_data = cursor.fetchone()
-            if not node_data:
-                return {}
-            
-            node_dict = {
-                "id": node_data[0],
-                "type": node_data[1],
-                "title": node_data[2],
-                "content": node_data[3],
-                "metadata": json.loads(node_data[4]),
-                "weight": node_data[5],
-                "access_count": node_data[6],
-                "children": []
-            }
-            
-            # Get children
-            cursor.execute('''
-                SELECT id FROM memory_nodes WHERE parent_id = ? ORDER BY weight DESC, created_at ASC
-            ''', (current_id,))
-            
-            children = cursor.fetchall()
-            for child in children:
-                child_tree = build_tree(child[0], depth + 1)
-                if child_tree:
-                    node_dict["children"].append(child_tree)
-            
-            return node_dict
-        
-        hierarchy = build_tree(node_id)
-        conn.close()
-        return hierarchy
+                WITH RECURSIVE subtree(id, depth) AS (
+                    SELECT id, 0 FROM memory_nodes WHERE id = ?
+                    UNION ALL
+                    SELECT n.id, s.depth + 1
+                    FROM memory_nodes n JOIN subtree s ON n.parent_id = s.id
+                    WHERE s.depth < ?
+                )
+                SELECT n.id, n.parent_id, n.node_type AS type, n.title, n.content, n.metadata,
+                       n.weight, n.access_count
+                FROM subtree s JOIN memory_nodes n ON n.id = s.id
+                ORDER BY s.depth, n.weight DESC, n.created_at ASC
+            ''', (node_id, max_depth - 1))
+            rows = cursor.fetchall()
+        
+        nodes_by_id = {}
+        for row in rows:
+            node_dict = dict(row)
+            parent_id = node_dict.pop("parent_id")
+            node_dict["metadata"] = _load_metadata(node_dict["metadata"])
+            node_dict["children"] = []
+            if node_dict["id"] != node_id:
+                nodes_by_id[parent_id]["children"].append(node_dict)
+            nodes_by_id[node_dict["id"]] = node_dict
+        
+        return nodes_by_id.get(node_id, {})
     
     def find_related_nodes(self, node_id: str, relationship_types: Optional[List[str]] = None,
                           max_distance: int = 2) -> List[Dict[str, Any]]:
         """Find nodes related through relationships"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if relationship_types:
-            placeholders = ','.join(['?' for _ in relationship_types])
-            cursor.execute(f'''
-                SELECT DISTINCT target_id, relationship_type, strength
-                FROM node_relationships 
-                WHERE source_id = ? AND relationship_type IN ({placeholders})
-                UNION
-                SELECT DISTINCT source_id, relationship_type, strength
-                FROM node_relationships 
-                WHERE target_id = ? AND relationship_type IN ({placeholders})
-            ''', [node_id] + relationship_types + [node_id] + relationship_types)
-        else:
-            cursor.execute('''
-                SELECT DISTINCT target_id, relationship_type, strength
-                FROM node_relationships WHERE source_id = ?
-                UNION
-                SELECT DISTINCT source_id, relationship_type, strength
-                FROM node_relationships WHERE target_id = ?
-            ''', (node_id, node_id))
-        
-        related_nodes = []
-        for row in cursor.fetchall():
-            related_nodes.append({
-                "node_id": row[0],
-                "relationship_type": row[1],
-                "strength": row[2]
-            })
-        
-        conn.close()
-        return related_nodes
+        # Each half is a seek on its covering index; UNION ALL skips the
+        # temp B-tree that UNION builds, and the rare duplicate (a reciprocal
+        # edge of the same type and strength) is dropped while collecting
+        with self._read_cursor() as cursor:
+            if relationship_types:
+                cursor.execute('''
+                    SELECT target_id AS node_id, relationship_type, strength
+                    FROM node_relationships
+                    WHERE source_id = ? AND relationship_type IN (SELECT value FROM json_each(?))
+                    UNION ALL
+                    SELECT source_id, relationship_type, strength
+                    FROM node_relationships
+                    WHERE target_id = ? AND relationship_type IN (SELECT value FROM json_each(?))
+                ''', (node_id, json.dumps(relationship_types), node_id, json.dumps(relationship_types)))
+            else:
+                cursor.execute('''
+                    SELECT target_id AS node_id, relationship_type, strength
+                    FROM node_relationships WHERE source_id = ?
+                    UNION ALL
+                    SELECT source_id, relationship_type, strength
+                    FROM node_relationships WHERE target_id = ?
+                ''', (node_id, node_id))
+            
+            return [dict(row) for row in dict.fromkeys(cursor.fetchall())]
     
     def create_tag(self, name: str, color: str = "#007acc", 
                   description: str = "") -> str:
-        """Create a new tag"""
-        tag_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO tags (id, name, color, description)
-            VALUES (?, ?, ?, ?)
-        ''', (tag_id, name, color, description))
-        
-        conn.commit()
-        conn.close()
-        return tag_id
+        """Create a new tag, returning its id (the existing id if the name is taken)"""
+        with self._cursor() as cursor:
+            cursor.execute('''
+                INSERT INTO tags (id, name, color, description)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO NOTHING
+            ''', (str(uuid.uuid4()), name, color, description))
+            cursor.execute('SELECT id FROM tags WHERE name = ?', (name,))
+            return cursor.fetchone()[0]
     
     def add_tag_to_node(self, node_id: str, tag_name: str, confidence: float = 1.0):
         """Add tag to node"""
-        # Get or create tag
-        tag_id = self.create_tag(tag_name)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO node_tags (node_id, tag_id, confidence)
-            VALUES (?, ?, ?)
-        ''', (node_id, tag_id, confidence))
-        
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor, self._transaction(cursor):
+            # Get or create tag, then link it by name in the same transaction
+            cursor.execute(self._SQL_UPSERT_TAG, (str(uuid.uuid4()), tag_name))
+            cursor.execute(self._SQL_TAG_NODE, (node_id, confidence, tag_name))
     
-    def search_by_tag(self, tag_name: str) -> List[Dict[str, Any]]:
-        """Find nodes by tag"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT n.id, n.node_type, n.title, n.content, n.metadata, nt.confidence
-            FROM memory_nodes n
-            JOIN node_tags nt ON n.id = nt.node_id
-            JOIN tags t ON nt.tag_id = t.id
-            WHERE t.name = ?
-            ORDER BY nt.confidence DESC, n.weight DESC
-        ''', (tag_name,))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "id": row[0],
-                "type": row[1],
-                "title": row[2],
-                "content": row[3],
-                "metadata": json.loads(row[4]),
-                "tag_confidence": row[5]
-            })
+    def add_tags_to_node(self, node_id: str, tag_names: List[str], confidence: float = 1.0):
+        """Add several tags to a node in one transaction"""
+        with self._cursor() as cursor, self._transaction(cursor):
+            cursor.executemany(self._SQL_UPSERT_TAG, [(str(uuid.uuid4()), name) for name in tag_names])
+            cursor.executemany(self._SQL_TAG_NODE, [(node_id, confidence, name) for name in tag_names])
+    
+    def search_by_tag(self, tag_name: str, role: Optional[str] = None,
+                      include_metadata: bool = True) -> List[Dict[str, Any]]:
+        """Find nodes by tag, optionally only those whose metadata role matches"""
+        params = [tag_name]
+        role_filter = ''
+        if role is not None:
+            # Filter inside SQLite rather than parsing metadata in Python
+            role_filter = "AND json_extract(n.metadata, '$.role') = ?"
+            params.append(role)
+        metadata_column = 'n.metadata, ' if include_metadata else ''
+        
+        with self._read_cursor() as cursor:
+            cursor.execute(f'''
+                SELECT n.id, n.node_type AS type, n.title, n.content, {metadata_column}nt.confidence AS tag_confidence
+                FROM node_tags nt
+                JOIN memory_nodes n ON n.id = nt.node_id
+                WHERE nt.tag_name = ? {role_filter}
+                ORDER BY nt.confidence DESC, n.weight DESC
+            ''', params)
+            
+            results = [dict(row) for row in cursor]
         
-        conn.close()
+        if include_metadata:
+            for result in results:
+                result["metadata"] = _load_metadata(result["metadata"])
         return results
     
     def get_memory_graph(self, center_node_id: Optional[str] = None, radius: int = 2) -> Dict[str, Any]:
         """Get memory as a graph structure"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if center_node_id:
-            # Get subgraph around center node
-            cursor.execute('''
-                SELECT id, node_type, title, weight FROM memory_nodes
-                WHERE id = ? OR parent_id IN (
-                    SELECT id FROM memory_nodes WHERE parent_id = ?
-                )
-            ''', (center_node_id, center_node_id))
-        else:
-            # Get all nodes
-            cursor.execute('SELECT id, node_type, title, weight FROM memory_nodes LIMIT 100')
-        
-        nodes = []
-        for row in cursor.fetchall():
-            nodes.append({
-                "id": row[0],
-                "type": row[1],
-                "title": row[2],
-                "weight": row[3]
-            })
-        
-        # Get relationships
-        cursor.execute('''
-            SELECT source_id, target_id, relationship_type, strength
-            FROM node_relationships
-            WHERE source_id IN (SELECT id FROM memory_nodes LIMIT 100)
-            AND target_id IN (SELECT id FROM memory_nodes LIMIT 100)
-        ''')
-        
-        relationships = []
-        for row in cursor.fetchall():
-            relationships.append({
-                "source": row[0],
-                "target": row[1],
-                "type": row[2],
-                "strength": row[3]
-            })
-        
-        conn.close()
+        with self._read_cursor() as cursor:
+            if center_node_id:
+                # Get subgraph: the center node and its descendants up to radius
+                cursor.execute('''
+                    WITH RECURSIVE subgraph(id, depth) AS (
+                        SELECT id, 0 FROM memory_nodes WHERE id = ?
+                        UNION ALL
+                        SELECT n.id, s.depth + 1
+                        FROM memory_nodes n JOIN subgraph s ON n.parent_id = s.id
+                        WHERE s.depth < ?
+                    )
+                    SELECT n.id, n.node_type AS type, n.title, n.weight
+                    FROM subgraph s JOIN memory_nodes n ON n.id = s.id
+                    ORDER BY s.depth, n.weight DESC
+                ''', (center_node_id, radius))
+            else:
+                # Get the heaviest nodes, in a stable order
+                cursor.execute('SELECT id, node_type AS type, title, weight FROM memory_nodes ORDER BY weight DESC LIMIT 100')
+            
+            nodes = [dict(row) for row in cursor]
+            
+            # Get relationships between the selected nodes, bound as parameters
+            ids = [node["id"] for node in nodes]
+            if not ids:
+                return {"nodes": nodes, "relationships": []}
+            
+            placeholders = ','.join('?' * len(ids))
+            cursor.execute(f'''
+                SELECT source_id AS source, target_id AS target, relationship_type AS type, strength
+                FROM node_relationships
+                WHERE source_id IN ({placeholders})
+                AND target_id IN ({placeholders})
+            ''', ids + ids)
+            relationships = [dict(row) for row in cursor]
         
         return {
             "nodes": nodes,
@@ -401,35 +627,62 @@ class HierarchicalMemoryManager:
     
     def auto_organize_memory(self):
         """Automatically organize memory based on content and relationships"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Find unorganized conversation nodes
-        cursor.execute('''
-            SELECT id, content FROM memory_nodes 
-            WHERE node_type = "conversation" AND parent_id NOT IN (
-                SELECT id FROM memory_nodes WHERE node_type = "session_root"
-            )
-        ''')
-        
-        unorganized = cursor.fetchall()
-        
-        for node_id, content in unorganized:
-            # Simple content analysis for organization
-            content_lower = content.lower()
+        with self._cursor() as cursor:
+            if self._has_fts:
+                # One full-text query per rule, so only ids leave SQLite; rules
+                # run in order and a node keeps the first tag that matched it
+                first_match = {}
+                for tag_name, query in AUTO_TAG_QUERIES:
+                    cursor.execute('''
+                        SELECT m.id FROM memory_nodes_fts f
+                        JOIN memory_nodes m ON m.seq = f.rowid
+                        WHERE memory_nodes_fts MATCH ? AND m.node_type = 'conversation'
+                        AND m.parent_id NOT IN (
+                            SELECT id FROM memory_nodes WHERE node_type = 'session_root'
+                        )
+                    ''', (query,))
+                    for (node_id,) in cursor.fetchall():
+                        first_match.setdefault(node_id, tag_name)
+                tagged = list(first_match.items())
+            else:
+                # Find unorganized conversation nodes
+                cursor.execute('''
+                    SELECT id, content FROM memory_nodes 
+                    WHERE node_type = "conversation" AND parent_id NOT IN (
+                        SELECT id FROM memory_nodes WHERE node_type = "session_root"
+                    )
+                ''')
+                
+                # Classify every node first, then write all tags in one transaction
+                tagged = []
+                for node_id, content in cursor.fetchall():
+                    tag_name = self._classify_content(content)
+                    if tag_name:
+                        tagged.append((node_id, tag_name))
             
-            # Categorize based on keywords
-            if any(keyword in content_lower for keyword in ['error', 'bug', 'fix']):
-                self.add_tag_to_node(node_id, "debugging")
-            elif any(keyword in content_lower for keyword in ['test', 'spec', 'assert']):
-                self.add_tag_to_node(node_id, "testing")
-            elif any(keyword in content_lower for keyword in ['deploy', 'production', 'release']):
-                self.add_tag_to_node(node_id, "deployment")
-            elif any(keyword in content_lower for keyword in ['api', 'endpoint', 'request']):
-                self.add_tag_to_node(node_id, "api")
-        
-        conn.commit()
-        conn.close()
+            if not tagged:
+                return
+            
+            tag_names = sorted({tag_name for _, tag_name in tagged})
+            placeholders = ','.join('?' for _ in tag_names)
+            
+            with self._transaction(cursor):
+                cursor.executemany(
+                    self._SQL_UPSERT_TAG,
+                    [(str(uuid.uuid4()), name) for name in tag_names]
+                )
+                cursor.execute(f'SELECT name, id FROM tags WHERE name IN ({placeholders})', tag_names)
+                tag_ids = dict(cursor.fetchall())
+                
+                cursor.executemany(
+                    self._SQL_TAG_NODE_BY_ID,
+                    [(node_id, tag_ids[tag_name], 1.0, tag_name) for node_id, tag_name in tagged]
+                )
+    
+    def _classify_content(self, content: str) -> Optional[str]:
+        """Pick an organizing tag for content by keyword, or None"""
+        match = AUTO_TAG_PATTERN.match(content)
+        return match.lastgroup if match else None
 
 if __name__ == "__main__":
     import sys
@@ -1,194 +1,318 @@
 #!/usr/bin/env python3
 
 import json
+import hashlib
 import sqlite3
 import os
-from datetime import datetime
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Rows deleted per statement by cleanup_old_data
+CLEANUP_BATCH_SIZE = 10000
+
+# Buffered conversation turns are written once this many are pending, or
+# this many seconds after the first one was buffered
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.05
+
+# Read size for hashing files where hashlib.file_digest is unavailable
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Stored in PRAGMA user_version once a database's file hashes carry an
+# algorithm tag
+SCHEMA_VERSION = 1
+
+def _tag_hash(content_hash: str) -> str:
+    """Return a hash in "algorithm:hexdigest" form; untagged values are
+    only accepted as legacy MD5 (32 hex digits)"""
+    if ':' in content_hash:
+        return content_hash
+    if len(content_hash) == 32 and all(c in '0123456789abcdefABCDEF' for c in content_hash):
+        return f"md5:{content_hash.lower()}"
+    raise ValueError(f"Untagged content hash {content_hash!r}; expected \"algorithm:hexdigest\"")
+
+def _load_metadata(text: Optional[str]) -> Dict:
+    """Parse a metadata column, skipping the JSON parser for empty objects"""
+    if not text or text == '{}':
+        return {}
+    return json.loads(text)
+
+def _flush_at_exit(manager_ref: weakref.ref):
+    """Write a live manager's buffered turns when the interpreter exits"""
+    manager = manager_ref()
+    if manager is not None:
+        manager.flush()
+
+def hash_file(file_path: str) -> str:
+    """Hash a file in constant memory, with BLAKE3 when it is installed,
+    returning "algorithm:hexdigest" """
+    if blake3 is not None:
+        digest = blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(file_path).hexdigest()
+        return f"blake3:{digest}"
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return f"sha256:{hashlib.file_digest(f, 'sha256').hexdigest()}"
+        # Python < 3.11
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+        return f"sha256:{hasher.hexdigest()}"
+
 class MemoryManager:
+    # Hot statements, kept as single strings so the connection's statement
+    # cache reuses their compiled programs
+    _SQL_STORE_CONVERSATION = 'INSERT INTO conversations (session_id, role, content, metadata, timestamp) VALUES (?, ?, ?, ?, ?)'
+    _SQL_STORE_CONTEXT = 'INSERT OR REPLACE INTO context (session_id, key, value) VALUES (?, ?, ?)'
+    _SQL_STORE_FILE = 'INSERT OR REPLACE INTO file_memory (file_path, content_hash, metadata) VALUES (?, ?, ?)'
+    
     def __init__(self, db_path: str = "memory.db"):
         self.db_path = db_path
+        # One autocommit connection per manager, shared by every call
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        self._lock = threading.RLock()
+        # Conversation turns waiting for the next batched commit
+        self._pending = []
+        self._flush_timer = None
+        # Turns still buffered at exit are written rather than dropped
+        self._exit_flush = weakref.finalize(self, _flush_at_exit, weakref.ref(self))
         self.init_database()
     
+    @contextmanager
+    def _cursor(self):
+        """Cursor on the shared connection, held under the manager lock"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+    
+    @contextmanager
+    def _transaction(self, cursor: sqlite3.Cursor):
+        """Run the enclosed statements in one write transaction"""
+        if self._conn.in_transaction:
+            yield
+            return
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+    
+    def flush(self):
+        """Write buffered conversation turns in a single transaction"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            
+            rows, self._pending = self._pending, []
+            try:
+                with self._cursor() as cursor, self._transaction(cursor):
+                    cursor.executemany(self._SQL_STORE_CONVERSATION, rows)
+            except BaseException:
+                self._pending[:0] = rows
+                raise
+    
+    def close(self):
+        """Flush pending writes and close the shared database connection"""
+        with self._lock:
+            self.flush()
+            self._exit_flush.detach()
+            self._conn.close()
+    
     def init_database(self):
         """Initialize SQLite database for memory storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                role TEXT NOT NULL,
-                content TEXT NOT NULL,
-                metadata TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS context (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                key TEXT NOT NULL,
-                value TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(session_id, key)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS file_memory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_path TEXT NOT NULL,
-                content_hash TEXT NOT NULL,
-                last_modified DATETIME DEFAULT CURRENT_TIMESTAMP,
-                metadata TEXT,
-                UNIQUE(file_path, content_hash)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            # Connection-wide settings, applied once
+            cursor.executescript('''
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                PRAGMA wal_autocheckpoint=1000;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_size=-32000;
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    metadata TEXT
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS context (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(session_id, key)
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS file_memory (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    last_modified DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    metadata TEXT,
+                    UNIQUE(file_path, content_hash)
+                )
+            ''')
+            
+            # Indexes for the history and file lookups
+            # Ascending, so a backward scan yields (timestamp, id) newest first
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conv_session_time ON conversations(session_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_file_memory_path_modified ON file_memory(file_path, last_modified DESC)')
+            
+            # Superseded by idx_conv_session_time
+            cursor.execute('DROP INDEX IF EXISTS idx_conv_session_ts')
+            
+            # Hashes stored before they carried an algorithm tag were MD5;
+            # tag them once, dropping any that duplicate a tagged row
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] < SCHEMA_VERSION:
+                with self._transaction(cursor):
+                    cursor.execute("UPDATE OR IGNORE file_memory SET content_hash = 'md5:' || content_hash WHERE instr(content_hash, ':') = 0")
+                    cursor.execute("DELETE FROM file_memory WHERE instr(content_hash, ':') = 0")
+                    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            
+            # Refresh planner statistics where they are stale
+            cursor.execute('PRAGMA optimize')
     
     def store_conversation(self, session_id: str, role: str, content: str, metadata: Optional[Dict] = None):
         """Store conversation turn"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO conversations (session_id, role, content, metadata)
-            VALUES (?, ?, ?, ?)
-        ''', (session_id, role, content, json.dumps(metadata or {})))
-        
-        conn.commit()
-        conn.close()
+        # Stamp the turn now, since it is only inserted at the next flush
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        with self._lock:
+            self._pending.append((session_id, role, content, json.dumps(metadata or {}), timestamp))
+            if len(self._pending) >= FLUSH_BATCH_SIZE:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
     
-    def get_conversation_history(self, session_id: str, limit: int = 50) -> List[Dict]:
+    def get_conversation_history(self, session_id: str, limit: int = 50,
+                                 include_metadata: bool = True) -> List[Dict]:
         """Retrieve conversation history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT role, content, metadata, timestamp
-            FROM conversations
-            WHERE session_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (session_id, limit))
+        metadata_column = 'metadata, ' if include_metadata else ''
+        self.flush()
+        with self._cursor() as cursor:
+            cursor.row_factory = sqlite3.Row
+            # Newest N turns via idx_conv_session_time, returned oldest first;
+            # id breaks ties between turns stored in the same second
+            cursor.execute(f'''
+                SELECT role, content, {metadata_column}timestamp FROM (
+                    SELECT id, role, content, {metadata_column}timestamp
+                    FROM conversations
+                    WHERE session_id = ?
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT ?
+                )
+                ORDER BY timestamp ASC, id ASC
+            ''', (session_id, limit))
+            
+            results = [dict(row) for row in cursor]
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'role': row[0],
-                'content': row[1],
-                'metadata': json.loads(row[2]),
-                'timestamp': row[3]
-            })
-        
-        conn.close()
-        return list(reversed(results))
+        if include_metadata:
+            for result in results:
+                result['metadata'] = _load_metadata(result['metadata'])
+        return results
     
     def store_context(self, session_id: str, key: str, value: str):
         """Store context information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO context (session_id, key, value)
-            VALUES (?, ?, ?)
-        ''', (session_id, key, value))
-        
-        conn.commit()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute(self._SQL_STORE_CONTEXT, (session_id, key, value))
     
     def get_context(self, session_id: str, key: Optional[str] = None) -> Dict[str, str]:
         """Retrieve context information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if key:
-            cursor.execute('''
-                SELECT value FROM context WHERE session_id = ? AND key = ?
-            ''', (session_id, key))
-            result = cursor.fetchone()
-            conn.close()
-            return {key: result[0]} if result else {}
-        else:
-            cursor.execute('''
-                SELECT key, value FROM context WHERE session_id = ?
-            ''', (session_id,))
-            results = dict(cursor.fetchall())
-            conn.close()
-            return results
+        with self._cursor() as cursor:
+            if key:
+                cursor.execute('''
+                    SELECT value FROM context WHERE session_id = ? AND key = ?
+                ''', (session_id, key))
+                result = cursor.fetchone()
+                return {key: result[0]} if result else {}
+            else:
+                cursor.execute('''
+                    SELECT key, value FROM context WHERE session_id = ?
+                ''', (session_id,))
+                return dict(cursor.fetchall())
     
     def store_file_memory(self, file_path: str, content_hash: str, metadata: Optional[Dict] = None):
-        """Store file information for memory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO file_memory (file_path, content_hash, metadata)
-            VALUES (?, ?, ?)
-        ''', (file_path, content_hash, json.dumps(metadata or {})))
-        
-        conn.commit()
-        conn.close()
+        """Store file information for memory; content_hash is "algorithm:hexdigest"
+        as returned by hash_file (a bare 32-digit hex value is taken as MD5)"""
+        content_hash = _tag_hash(content_hash)
+        with self._cursor() as cursor:
+            cursor.execute(self._SQL_STORE_FILE, (file_path, content_hash, json.dumps(metadata or {})))
     
     def get_file_memory(self, file_path: Optional[str] = None) -> List[Dict]:
         """Retrieve file memory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if file_path:
-            cursor.execute('''
-                SELECT file_path, content_hash, metadata, last_modified
-                FROM file_memory
-                WHERE file_path = ?
-                ORDER BY last_modified DESC
-            ''', (file_path,))
-        else:
-            cursor.execute('''
-                SELECT file_path, content_hash, metadata, last_modified
-                FROM file_memory
-                ORDER BY last_modified DESC
-                LIMIT 100
-            ''')
+        with self._cursor() as cursor:
+            cursor.row_factory = sqlite3.Row
+            if file_path:
+                cursor.execute('''
+                    SELECT file_path, content_hash, metadata, last_modified
+                    FROM file_memory
+                    WHERE file_path = ?
+                    ORDER BY last_modified DESC
+                ''', (file_path,))
+            else:
+                cursor.execute('''
+                    SELECT file_path, content_hash, metadata, last_modified
+                    FROM file_memory
+                    ORDER BY last_modified DESC
+                    LIMIT 100
+                ''')
+            
+            results = [dict(row) for row in cursor]
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'file_path': row[0],
-                'content_hash': row[1],
-                'metadata': json.loads(row[2]),
-                'last_modified': row[3]
-            })
-        
-        conn.close()
+        for result in results:
+            result['metadata'] = _load_metadata(result['metadata'])
         return results
     
     def cleanup_old_data(self, days: int = 30):
         """Clean up old data to prevent database bloat"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cutoff_date = datetime.now().replace(tzinfo=None).timestamp() - (days * 24 * 3600)
-        
-        cursor.execute('''
-            DELETE FROM conversations WHERE timestamp < datetime(?, 'unixepoch')
-        ''', (cutoff_date,))
-        
-        cursor.execute('''
-            DELETE FROM file_memory WHERE last_modified < datetime(?, 'unixepoch')
-        ''', (cutoff_date,))
-        
-        conn.commit()
-        conn.close()
+        # SQLite computes the cutoff once; old rows are removed in bounded
+        # batches, each its own transaction, so the WAL can checkpoint between them
+        cutoff = f'-{int(days)} days'
+        self.flush()
+        with self._cursor() as cursor:
+            for table, column in (('conversations', 'timestamp'), ('file_memory', 'last_modified')):
+                while True:
+                    cursor.execute(f'''
+                        DELETE FROM {table} WHERE id IN (
+                            SELECT id FROM {table}
+                            WHERE {column} < datetime('now', ?)
+                            LIMIT ?
+                        )
+                    ''', (cutoff, CLEANUP_BATCH_SIZE))
+                    if cursor.rowcount < CLEANUP_BATCH_SIZE:
+                        break
 
 if __name__ == "__main__":
     import sys
-    import hashlib
     
     if len(sys.argv) < 3:
         print("Usage: python memory_manager.py <action> [args...]")
@@ -227,9 +351,7 @@ if __name__ == "__main__":
     elif action == "store_file":
         file_path = sys.argv[2]
         if os.path.exists(file_path):
-            with open(file_path, 'rb') as f:
-                content_hash = hashlib.md5(f.read()).hexdigest()
-            memory.store_file_memory(file_path, content_hash)
+            memory.store_file_memory(file_path, hash_file(file_path))
             print("File memory stored successfully")
         else:
             print(f"File {file_path} does not exist")
@@ -245,4 +367,6 @@ if __name__ == "__main__":
         print(f"Cleaned up data older than {days} days")
     
     else:
-        print(f"Unknown action: {action}")
\ No newline at end of file
+        print(f"Unknown action: {action}")
+    
+    memory.close()
\ No newline at end of file
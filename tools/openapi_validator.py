@@ -3,18 +3,29 @@
 import json
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Top-level fields every spec needs, with the issue reported when missing
+REQUIRED_FIELDS = {
+    'openapi': "Missing 'openapi' field.",
+    'info': "Missing 'info' section.",
+    'paths': "Missing 'paths' section.",
+}
+
 def load_openapi(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def validate_openapi(spec):
-    issues = []
-    if 'openapi' not in spec:
-        issues.append("Missing 'openapi' field.")
-    if 'info' not in spec:
-        issues.append("Missing 'info' section.")
-    if 'paths' not in spec:
-        issues.append("Missing 'paths' section.")
+    # One set difference instead of a membership test per field
+    missing = REQUIRED_FIELDS.keys() - spec.keys()
+    issues = [message for field, message in REQUIRED_FIELDS.items() if field in missing]
     # Add more validations as needed
     return issues
 
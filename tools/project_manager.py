@@ -2,13 +2,120 @@
 
 import json
 import os
-import subprocess
 import tempfile
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj: Any) -> str:
+    """Indented JSON for CLI output, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+# Scaffolds with at least this many files are written from a thread pool
+# of at most MAX_WRITE_WORKERS threads
+PARALLEL_WRITE_MIN = 3
+MAX_WRITE_WORKERS = 8
+
+# Go language version declared in generated go.mod files
+GO_VERSION = "1.22"
+
+# Scaffold files per project type as (relative path, body) templates,
+# filled in with str.format_map({"name": ...})
+_TEMPLATES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "python": (
+        ("src/main.py", '#!/usr/bin/env python3\n\n"""\n{name} - Main module\n"""\n\ndef main():\n    print("Hello, World!")\n\nif __name__ == "__main__":\n    main()\n'),
+        ("requirements.txt", "# Add your dependencies here\n"),
+        ("setup.py", 'from setuptools import setup, find_packages\n\nsetup(\n    name="{name}",\n    version="0.1.0",\n    packages=find_packages(),\n    install_requires=[],\n)\n'),
+        ("tests/test_main.py", 'import unittest\nfrom src.main import main\n\nclass TestMain(unittest.TestCase):\n    def test_main(self):\n        # Add your tests here\n        pass\n\nif __name__ == "__main__":\n    unittest.main()\n'),
+    ),
+    "node": (
+        ("src/index.js", 'console.log("Hello, {name}!");\n'),
+        ("tests/index.test.js", 'test("{name} basic test", () => {{\n  expect(true).toBe(true);\n}});\n'),
+    ),
+    "react": (
+        ("public/index.html", '<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="utf-8" />\n    <meta name="viewport" content="width=device-width, initial-scale=1" />\n    <title>{name}</title>\n</head>\n<body>\n    <div id="root"></div>\n</body>\n</html>\n'),
+        ("src/App.js", 'import React from "react";\nimport "./App.css";\n\nfunction App() {{\n  return (\n    <div className="App">\n      <header className="App-header">\n        <h1>Welcome to {name}</h1>\n      </header>\n    </div>\n  );\n}}\n\nexport default App;\n'),
+        ("src/index.js", 'import React from "react";\nimport ReactDOM from "react-dom/client";\nimport "./index.css";\nimport App from "./App";\n\nconst root = ReactDOM.createRoot(document.getElementById("root"));\nroot.render(\n  <React.StrictMode>\n    <App />\n  </React.StrictMode>\n);\n'),
+    ),
+    "go": (
+        # go.mod is written directly rather than spawning `go mod init`
+        ("go.mod", "module {name}\n\ngo " + GO_VERSION + "\n"),
+        ("cmd/{name}/main.go", 'package main\n\nimport "fmt"\n\nfunc main() {{\n    fmt.Println("Hello, {name}!")\n}}\n'),
+    ),
+}
+
+# package.json manifests, serialized once at import; the project name is
+# spliced in later as an already JSON-escaped string
+_NAME_PLACEHOLDER = "__NAME__"
+_PACKAGE_JSON_TEMPLATES: Dict[str, str] = {
+    "node": json.dumps({
+        "name": _NAME_PLACEHOLDER,
+        "version": "1.0.0",
+        "description": _NAME_PLACEHOLDER + " project",
+        "main": "src/index.js",
+        "scripts": {
+            "start": "node src/index.js",
+            "test": "jest",
+            "dev": "nodemon src/index.js"
+        },
+        "keywords": [],
+        "author": "",
+        "license": "ISC",
+        "dependencies": {},
+        "devDependencies": {
+            "jest": "^29.0.0",
+            "nodemon": "^3.0.0"
+        }
+    }, indent=2),
+    "react": json.dumps({
+        "name": _NAME_PLACEHOLDER,
+        "version": "0.1.0",
+        "private": True,
+        "dependencies": {
+            "react": "^18.2.0",
+            "react-dom": "^18.2.0",
+            "react-scripts": "5.0.1"
+        },
+        "scripts": {
+            "start": "react-scripts start",
+            "build": "react-scripts build",
+            "test": "react-scripts test",
+            "eject": "react-scripts eject"
+        },
+        "eslintConfig": {
+            "extends": [
+                "react-app",
+                "react-app/jest"
+            ]
+        },
+        "browserslist": {
+            "production": [
+                ">0.2%",
+                "not dead",
+                "not op_mini all"
+            ],
+            "development": [
+                "last 1 chrome version",
+                "last 1 firefox version",
+                "last 1 safari version"
+            ]
+        }
+    }, indent=2),
+}
 
 class ProjectManager:
+    __slots__ = ("temp_dir", "_detect_cache")
+    
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
+        # path -> ((directory mtime, package.json mtime), detected type)
+        self._detect_cache: Dict[str, Tuple[Tuple[int, Optional[int]], Optional[Dict[str, Any]]]] = {}
     
     def create_project_template(self, project_type: str, project_name: str, base_path: str = ".") -> Dict[str, Any]:
         """Create a new project from template"""
@@ -18,16 +125,18 @@ class ProjectManager:
             os.makedirs(project_path, exist_ok=True)
             
             if project_type == "python":
-                self._create_python_project(project_path, project_name)
+                entries = self._create_python_project(project_path, project_name)
             elif project_type == "node":
-                self._create_node_project(project_path, project_name)
+                entries = self._create_node_project(project_path, project_name)
             elif project_type == "react":
-                self._create_react_project(project_path, project_name)
+                entries = self._create_react_project(project_path, project_name)
             elif project_type == "go":
-                self._create_go_project(project_path, project_name)
+                entries = self._create_go_project(project_path, project_name)
             else:
                 return {"error": f"Unsupported project type: {project_type}"}
             
+            self._write_files(project_path, entries)
+            
             return {
                 "success": True,
                 "project_path": project_path,
@@ -37,165 +146,142 @@ class ProjectManager:
         except Exception as e:
             return {"error": f"Error creating project: {str(e)}"}
     
+    def _mkdirs_batch(self, root: str, leaves: List[str]):
+        """Create leaf directories under an existing root"""
+        # A plain mkdir is a single syscall; only a leaf whose parent is
+        # missing pays for makedirs' walk up the path
+        prefix = os.path.join(root, "")
+        for leaf in leaves:
+            leaf_path = prefix + leaf
+            try:
+                os.mkdir(leaf_path)
+            except FileNotFoundError:
+                os.makedirs(leaf_path)
+    
+    def _write_files(self, project_path: str, entries: List[Tuple[str, str]]):
+        """Write (relative path, text) entries, fanning out across threads"""
+        # Directories already exist, so the files are independent; the GIL
+        # is released around each syscall, letting slow mounts overlap them
+        # Join the root once; relative paths are already '/'-separated
+        prefix = os.path.join(project_path, "")
+        paths = [prefix + rel_path for rel_path, _ in entries]
+        texts = [text for _, text in entries]
+        if len(entries) < PARALLEL_WRITE_MIN:
+            for file_path, text in zip(paths, texts):
+                self._write_file(file_path, text)
+            return
+        with ThreadPoolExecutor(max_workers=min(MAX_WRITE_WORKERS, len(entries))) as pool:
+            list(pool.map(self._write_file, paths, texts))
+    
+    def _write_file(self, file_path: str, text: str):
+        """Write text to a file with a raw descriptor"""
+        # One open/write/close, skipping the buffered text layer and its
+        # extra fstat/isatty probes
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            data = text.encode('utf-8')
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+    
+    def _render_templates(self, project_type: str, name: str) -> List[Tuple[str, str]]:
+        """Fill in the file templates for a project type"""
+        values = {"name": name}
+        return [(rel_path.format_map(values), body.format_map(values))
+                for rel_path, body in _TEMPLATES[project_type]]
+    
+    def _render_package_json(self, project_type: str, name: str) -> str:
+        """Fill the project name into a pre-serialized package.json"""
+        return _PACKAGE_JSON_TEMPLATES[project_type].replace(_NAME_PLACEHOLDER, json.dumps(name)[1:-1])
+    
     def _create_python_project(self, path: str, name: str):
-        """Create Python project structure"""
-        os.makedirs(os.path.join(path, "src"))
-        os.makedirs(os.path.join(path, "tests"))
-        
-        # Create main.py
-        with open(os.path.join(path, "src", "main.py"), 'w') as f:
-            f.write(f'#!/usr/bin/env python3\n\n"""\n{name} - Main module\n"""\n\ndef main():\n    print("Hello, World!")\n\nif __name__ == "__main__":\n    main()\n')
-        
-        # Create requirements.txt
-        with open(os.path.join(path, "requirements.txt"), 'w') as f:
-            f.write("# Add your dependencies here\n")
-        
-        # Create setup.py
-        with open(os.path.join(path, "setup.py"), 'w') as f:
-            f.write(f'from setuptools import setup, find_packages\n\nsetup(\n    name="{name}",\n    version="0.1.0",\n    packages=find_packages(),\n    install_requires=[],\n)\n')
+        """Create Python project directories and return the files to write"""
+        self._mkdirs_batch(path, ["src", "tests"])
         
-        # Create test file
-        with open(os.path.join(path, "tests", "test_main.py"), 'w') as f:
-            f.write(f'import unittest\nfrom src.main import main\n\nclass TestMain(unittest.TestCase):\n    def test_main(self):\n        # Add your tests here\n        pass\n\nif __name__ == "__main__":\n    unittest.main()\n')
+        return self._render_templates("python", name)
     
     def _create_node_project(self, path: str, name: str):
-        """Create Node.js project structure"""
-        os.makedirs(os.path.join(path, "src"))
-        os.makedirs(os.path.join(path, "tests"))
-        
-        # Create package.json
-        package_json = {
-            "name": name,
-            "version": "1.0.0",
-            "description": f"{name} project",
-            "main": "src/index.js",
-            "scripts": {
-                "start": "node src/index.js",
-                "test": "jest",
-                "dev": "nodemon src/index.js"
-            },
-            "keywords": [],
-            "author": "",
-            "license": "ISC",
-            "dependencies": {},
-            "devDependencies": {
-                "jest": "^29.0.0",
-                "nodemon": "^3.0.0"
-            }
-        }
-        
-        with open(os.path.join(path, "package.json"), 'w') as f:
-            json.dump(package_json, f, indent=2)
+        """Create Node.js project directories and return the files to write"""
+        self._mkdirs_batch(path, ["src", "tests"])
         
-        # Create index.js
-        with open(os.path.join(path, "src", "index.js"), 'w') as f:
-            f.write(f'console.log("Hello, {name}!");\n')
-        
-        # Create test file
-        with open(os.path.join(path, "tests", "index.test.js"), 'w') as f:
-            f.write(f'test("{name} basic test", () => {{\n  expect(true).toBe(true);\n}});\n')
+        return [("package.json", self._render_package_json("node", name))] + self._render_templates("node", name)
     
     def _create_react_project(self, path: str, name: str):
-        """Create React project structure"""
-        os.makedirs(os.path.join(path, "src"))
-        os.makedirs(os.path.join(path, "public"))
-        
-        # Create package.json
-        package_json = {
-            "name": name,
-            "version": "0.1.0",
-            "private": True,
-            "dependencies": {
-                "react": "^18.2.0",
-                "react-dom": "^18.2.0",
-                "react-scripts": "5.0.1"
-            },
-            "scripts": {
-                "start": "react-scripts start",
-                "build": "react-scripts build",
-                "test": "react-scripts test",
-                "eject": "react-scripts eject"
-            },
-            "eslintConfig": {
-                "extends": [
-                    "react-app",
-                    "react-app/jest"
-                ]
-            },
-            "browserslist": {
-                "production": [
-                    ">0.2%",
-                    "not dead",
-                    "not op_mini all"
-                ],
-                "development": [
-                    "last 1 chrome version",
-                    "last 1 firefox version",
-                    "last 1 safari version"
-                ]
-            }
-        }
-        
-        with open(os.path.join(path, "package.json"), 'w') as f:
-            json.dump(package_json, f, indent=2)
-        
-        # Create public/index.html
-        with open(os.path.join(path, "public", "index.html"), 'w') as f:
-            f.write(f'<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="utf-8" />\n    <meta name="viewport" content="width=device-width, initial-scale=1" />\n    <title>{name}</title>\n</head>\n<body>\n    <div id="root"></div>\n</body>\n</html>\n')
-        
-        # Create src/App.js
-        with open(os.path.join(path, "src", "App.js"), 'w') as f:
-            f.write(f'import React from "react";\nimport "./App.css";\n\nfunction App() {{\n  return (\n    <div className="App">\n      <header className="App-header">\n        <h1>Welcome to {name}</h1>\n      </header>\n    </div>\n  );\n}}\n\nexport default App;\n')
+        """Create React project directories and return the files to write"""
+        self._mkdirs_batch(path, ["src", "public"])
         
-        # Create src/index.js
-        with open(os.path.join(path, "src", "index.js"), 'w') as f:
-            f.write(f'import React from "react";\nimport ReactDOM from "react-dom/client";\nimport "./index.css";\nimport App from "./App";\n\nconst root = ReactDOM.createRoot(document.getElementById("root"));\nroot.render(\n  <React.StrictMode>\n    <App />\n  </React.StrictMode>\n);\n')
+        return [("package.json", self._render_package_json("react", name))] + self._render_templates("react", name)
     
     def _create_go_project(self, path: str, name: str):
-        """Create Go project structure"""
-        os.makedirs(os.path.join(path, "cmd", name))
-        os.makedirs(os.path.join(path, "internal"))
-        os.makedirs(os.path.join(path, "pkg"))
+        """Create Go project directories and return the files to write"""
+        self._mkdirs_batch(path, [f"cmd/{name}", "internal", "pkg"])
         
-        # Create go.mod
-        result = subprocess.run(['go', 'mod', 'init', name], cwd=path, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"Warning: Could not initialize go module: {result.stderr}")
-        
-        # Create main.go
-        with open(os.path.join(path, "cmd", name, "main.go"), 'w') as f:
-            f.write(f'package main\n\nimport "fmt"\n\nfunc main() {{\n    fmt.Println("Hello, {name}!")\n}}\n')
+        return self._render_templates("go", name)
     
     def list_projects(self, base_path: str = ".") -> List[Dict[str, Any]]:
         """List all projects in the given directory"""
         projects = []
         
-        for item in os.listdir(base_path):
-            item_path = os.path.join(base_path, item)
-            if os.path.isdir(item_path):
-                project_info = self._detect_project_type(item_path)
-                if project_info:
-                    project_info["name"] = item
-                    project_info["path"] = item_path
-                    projects.append(project_info)
+        # scandir hands back the file type with each entry, so only symlinks
+        # cost an extra stat for the directory check
+        seen = set()
+        with os.scandir(base_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    seen.add(entry.path)
+                    project_info = self._detect_project_type(entry.path)
+                    if project_info:
+                        project_info["name"] = entry.name
+                        project_info["path"] = entry.path
+                        projects.append(project_info)
+        
+        # Forget cached directories under base_path that have gone away
+        parent = os.path.dirname(os.path.join(base_path, ""))
+        for path in [path for path in self._detect_cache
+                     if path not in seen and os.path.dirname(path) == parent]:
+            del self._detect_cache[path]
         
         return projects
     
     def _detect_project_type(self, path: str) -> Optional[Dict[str, Any]]:
+        """Detect project type, reusing the last result while nothing changed"""
+        # Marker files appearing or disappearing bump the directory mtime;
+        # package.json is also checked since it can be edited in place
+        dir_mtime = os.stat(path).st_mtime_ns
+        try:
+            package_mtime = os.stat(os.path.join(path, "package.json")).st_mtime_ns
+        except OSError:
+            package_mtime = None
+        stamp = (dir_mtime, package_mtime)
+        
+        cached = self._detect_cache.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, self._probe_project_type(path))
+            self._detect_cache[path] = cached
+        
+        # Callers add fields to the result, so hand out a copy
+        return dict(cached[1]) if cached[1] else None
+    
+    def _probe_project_type(self, path: str) -> Optional[Dict[str, Any]]:
         """Detect project type based on files present"""
-        if os.path.exists(os.path.join(path, "package.json")):
-            with open(os.path.join(path, "package.json"), 'r') as f:
-                package_data = json.load(f)
-                dependencies = package_data.get("dependencies", {})
-                if "react" in dependencies:
-                    return {"type": "react", "framework": "React"}
-                else:
-                    return {"type": "node", "framework": "Node.js"}
-        
-        elif os.path.exists(os.path.join(path, "setup.py")) or os.path.exists(os.path.join(path, "pyproject.toml")):
+        # One directory listing instead of a stat per marker file
+        with os.scandir(path) as entries:
+            names = {entry.name for entry in entries}
+        
+        if "package.json" in names:
+            with open(os.path.join(path, "package.json"), 'rb') as f:
+                raw = f.read()
+            # Only a manifest that mentions react at all needs parsing
+            if b'"react"' in raw and "react" in json.loads(raw).get("dependencies", {}):
+                return {"type": "react", "framework": "React"}
+            else:
+                return {"type": "node", "framework": "Node.js"}
+        
+        elif "setup.py" in names or "pyproject.toml" in names:
             return {"type": "python", "framework": "Python"}
         
-        elif os.path.exists(os.path.join(path, "go.mod")):
+        elif "go.mod" in names:
             return {"type": "go", "framework": "Go"}
         
         return None
@@ -221,12 +307,12 @@ if __name__ == "__main__":
         base_path = sys.argv[4] if len(sys.argv) > 4 else "."
         
         result = manager.create_project_template(project_type, project_name, base_path)
-        print(json.dumps(result, indent=2))
+        print(_dumps(result))
     
     elif action == "list_projects":
         base_path = sys.argv[2] if len(sys.argv) > 2 else "."
         projects = manager.list_projects(base_path)
-        print(json.dumps(projects, indent=2))
+        print(_dumps(projects))
     
     else:
         print(f"Unknown action: {action}")
\ No newline at end of file
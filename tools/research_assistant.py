@@ -6,9 +6,231 @@ Helps agents access and synthesize academic research papers.
 """
 
 import json
-from typing import List, Dict, Any, Optional
+import re
+from collections import Counter
+from itertools import chain
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: Any) -> str:
+    """Indented JSON for CLI output, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+# Implementation notes by algorithm keyword; keywords are tried in this
+# order and the first one found in the algorithm name wins
+IMPLEMENTATION_NOTES = {
+    "auction": "Implement sealed-bid or open auction. Agents bid based on cost/capability. Winner selected by lowest cost or highest value.",
+    "voting": "Each agent casts vote. Count votes and determine winner by majority, plurality, or threshold. Support weighted voting if needed.",
+    "consensus": "Request agreement from all agents. Require threshold (e.g., 66%) to reach consensus. Use timeout for non-responsive agents.",
+    "swarm": "Multiple agents work in parallel. Each explores solution space independently. Aggregate results to find best solution.",
+    "debate": "Agents propose solutions and critique each other. Multiple rounds of refinement. Final vote on best solution.",
+    "hierarchical": "Decompose problem into sub-problems. Allocate sub-problems to agents. Combine solutions bottom-up.",
+}
+DEFAULT_IMPLEMENTATION_NOTE = "General implementation: Design agent coordination protocol, define message types, implement decision logic."
+
+# Code examples by algorithm keyword, tried in the same way
+CODE_EXAMPLES = {
+    "auction": """
+# Auction-based task allocation
+def allocate_via_auction(task, agents):
+    bids = {}
+    for agent in agents:
+        bids[agent.id] = agent.calculate_bid(task)
+    
+    winner = min(bids.items(), key=lambda x: x[1])[0]
+    return winner
+            """,
+    "voting": """
+# Democratic voting
+def vote_on_solution(solutions, agents):
+    votes = {}
+    for solution in solutions:
+        votes[solution] = 0
+    
+    for agent in agents:
+        choice = agent.vote(solutions)
+        votes[choice] += 1
+    
+    winner = max(votes.items(), key=lambda x: x[1])[0]
+    return winner
+            """,
+    "consensus": """
+# Consensus building
+def reach_consensus(proposal, agents, threshold=0.66):
+    agreements = 0
+    for agent in agents:
+        if agent.evaluate(proposal):
+            agreements += 1
+    
+    agreement_rate = agreements / len(agents)
+    return agreement_rate >= threshold
+            """,
+}
+DEFAULT_CODE_EXAMPLE = "# Code example not available for this algorithm"
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile keywords into one regex whose lastgroup is the first keyword,
+    in priority order rather than position, that occurs in the text"""
+    return re.compile(
+        r'\A(?:' + '|'.join(f'(?=.*?{re.escape(keyword)})(?P<{keyword}>)' for keyword in keywords) + ')',
+        re.DOTALL
+    )
+
+
+_NOTE_PATTERN = _keyword_pattern(IMPLEMENTATION_NOTES)
+_CODE_PATTERN = _keyword_pattern(CODE_EXAMPLES)
+
+
+# Academic papers on multi-agent democratic problem solving (2024-2025)
+_RAW_DB = {
+    "multi_agent_decision_making": {
+        "title": "A Comprehensive Survey on Multi-Agent Cooperative Decision-Making",
+        "authors": ["Multiple Authors"],
+        "year": 2025,
+        "arxiv": "2503.13415",
+        "url": "https://arxiv.org/abs/2503.13415",
+        "summary": "Comprehensive survey covering major algorithms, simulation platforms, and problem-solving scenarios in multi-agent systems. Organizes approaches into rule-based, game theory, evolutionary algorithms, MARL, and LLM reasoning.",
+        "key_concepts": [
+            "Multi-Agent Reinforcement Learning (MARL)",
+            "Game theory for incentive design",
+            "Evolutionary algorithms",
+            "LLM-based reasoning",
+            "Cooperative decision-making"
+        ],
+        "algorithms": [
+            "Actor-critic frameworks",
+            "Distributed Q-learning",
+            "Policy gradient methods"
+        ]
+    },
+    "llm_collaboration": {
+        "title": "Multi-Agent Collaboration Mechanisms: A Survey of LLMs",
+        "authors": ["Multiple Authors"],
+        "year": 2025,
+        "arxiv": "2501.06322",
+        "url": "https://arxiv.org/abs/2501.06322",
+        "summary": "Research on collaborative agentic AI powered by LLMs. Covers dynamic division of labor, peer-to-peer debate, and cooperative reasoning among distributed agents.",
+        "key_concepts": [
+            "LLM-powered agents",
+            "Dynamic division of labor",
+            "Peer-to-peer debate",
+            "Cooperative reasoning",
+            "Democratic agent interactions"
+        ],
+        "algorithms": [
+            "Debate-based refinement",
+            "Collaborative prompting",
+            "Multi-agent conversation"
+        ]
+    },
+    "decentralized_marl": {
+        "title": "Decentralized Multi-Agent Reinforcement Learning",
+        "authors": ["Frontiers in Robotics & AI"],
+        "year": 2024,
+        "url": "https://www.frontiersin.org/journals/robotics-and-ai/articles/10.3389/frobt.2024.1229026",
+        "summary": "Modern actor-critic frameworks for decentralized training and execution. Agents model others as responsive entities, balancing individual rewards with team objectives.",
+        "key_concepts": [
+            "Decentralized training",
+            "Actor-critic methods",
+            "Privacy-preserving learning",
+            "Scalable coordination"
+        ],
+        "algorithms": [
+            "Decentralized actor-critic",
+            "Independent learners",
+            "Value decomposition networks"
+        ]
+    },
+    "resource_allocation": {
+        "title": "Survey of Distributed Algorithms for Resource Allocation",
+        "authors": ["ScienceDirect"],
+        "year": 2024,
+        "url": "https://www.sciencedirect.com/science/article/pii/S1367578824000518",
+        "summary": "Distributed algorithms for resource allocation and consensus. Includes auction-based methods, greedy assignments, and negotiation protocols for agents to allocate tasks without global information.",
+        "key_concepts": [
+            "Auction-based allocation",
+            "Greedy assignment",
+            "Negotiation protocols",
+            "Distributed consensus"
+        ],
+        "algorithms": [
+            "First-price sealed bid auction",
+            "Vickrey auction",
+            "Combinatorial auctions",
+            "Contract net protocol"
+        ]
+    },
+    "path_finding_negotiation": {
+        "title": "Decentralized Multi-Agent Path Finding Framework",
+        "authors": ["Springer"],
+        "year": 2024,
+        "url": "https://link.springer.com/article/10.1007/s10458-024-09639-8",
+        "summary": "Framework for automated negotiation in multi-agent systems. Focuses on conflict resolution and coordination without centralized control.",
+        "key_concepts": [
+            "Automated negotiation",
+            "Conflict resolution",
+            "Decentralized coordination",
+            "Path finding algorithms"
+        ],
+        "algorithms": [
+            "Alternating offers",
+            "Multi-lateral negotiation",
+            "Best-response dynamics"
+        ]
+    },
+    "swarm_intelligence": {
+        "title": "Swarm Intelligence Decentralized Decision Making",
+        "authors": ["IEEE"],
+        "year": 2023,
+        "url": "https://ieeexplore.ieee.org/document/10192625",
+        "summary": "Democratic systems that avoid centralized control through swarm intelligence. Includes voting, distributed negotiation, and best-response dynamics.",
+        "key_concepts": [
+            "Swarm intelligence",
+            "Collective behavior",
+            "Distributed voting",
+            "Emergent coordination"
+        ],
+        "algorithms": [
+            "Particle swarm optimization",
+            "Ant colony optimization",
+            "Bee colony algorithms",
+            "Flocking behaviors"
+        ]
+    },
+    "distributed_computing": {
+        "title": "Distributed Computing in Multi-Agent Systems",
+        "authors": ["Springer"],
+        "year": 2024,
+        "url": "https://link.springer.com/content/pdf/10.1007/s00607-024-01356-0.pdf",
+        "summary": "Privacy-preserving distributed machine learning. Algorithms maintain data confidentiality by splitting learning tasks among agents, essential for democratic distributed systems.",
+        "key_concepts": [
+            "Distributed machine learning",
+            "Privacy preservation",
+            "Federated learning",
+            "Data sovereignty"
+        ],
+        "algorithms": [
+            "Federated averaging",
+            "Split learning",
+            "Differential privacy"
+        ]
+    }
+}
+
+# Shared read-only view; every assistant instance binds this same mapping
+_RESEARCH_DATABASE = MappingProxyType(_RAW_DB)
+
 
 class AcademicResearchAssistant:
     """
@@ -16,145 +238,134 @@ class AcademicResearchAssistant:
     Provides summaries of key papers and algorithms.
     """
     
-    # Academic papers on multi-agent democratic problem solving (2024-2025)
-    RESEARCH_DATABASE = {
-        "multi_agent_decision_making": {
-            "title": "A Comprehensive Survey on Multi-Agent Cooperative Decision-Making",
-            "authors": ["Multiple Authors"],
-            "year": 2025,
-            "arxiv": "2503.13415",
-            "url": "https://arxiv.org/abs/2503.13415",
-            "summary": "Comprehensive survey covering major algorithms, simulation platforms, and problem-solving scenarios in multi-agent systems. Organizes approaches into rule-based, game theory, evolutionary algorithms, MARL, and LLM reasoning.",
-            "key_concepts": [
-                "Multi-Agent Reinforcement Learning (MARL)",
-                "Game theory for incentive design",
-                "Evolutionary algorithms",
-                "LLM-based reasoning",
-                "Cooperative decision-making"
-            ],
-            "algorithms": [
-                "Actor-critic frameworks",
-                "Distributed Q-learning",
-                "Policy gradient methods"
-            ]
-        },
-        "llm_collaboration": {
-            "title": "Multi-Agent Collaboration Mechanisms: A Survey of LLMs",
-            "authors": ["Multiple Authors"],
-            "year": 2025,
-            "arxiv": "2501.06322",
-            "url": "https://arxiv.org/abs/2501.06322",
-            "summary": "Research on collaborative agentic AI powered by LLMs. Covers dynamic division of labor, peer-to-peer debate, and cooperative reasoning among distributed agents.",
-            "key_concepts": [
-                "LLM-powered agents",
-                "Dynamic division of labor",
-                "Peer-to-peer debate",
-                "Cooperative reasoning",
-                "Democratic agent interactions"
-            ],
-            "algorithms": [
-                "Debate-based refinement",
-                "Collaborative prompting",
-                "Multi-agent conversation"
-            ]
-        },
-        "decentralized_marl": {
-            "title": "Decentralized Multi-Agent Reinforcement Learning",
-            "authors": ["Frontiers in Robotics & AI"],
-            "year": 2024,
-            "url": "https://www.frontiersin.org/journals/robotics-and-ai/articles/10.3389/frobt.2024.1229026",
-            "summary": "Modern actor-critic frameworks for decentralized training and execution. Agents model others as responsive entities, balancing individual rewards with team objectives.",
-            "key_concepts": [
-                "Decentralized training",
-                "Actor-critic methods",
-                "Privacy-preserving learning",
-                "Scalable coordination"
-            ],
-            "algorithms": [
-                "Decentralized actor-critic",
-                "Independent learners",
-                "Value decomposition networks"
-            ]
-        },
-        "resource_allocation": {
-            "title": "Survey of Distributed Algorithms for Resource Allocation",
-            "authors": ["ScienceDirect"],
-            "year": 2024,
-            "url": "https://www.sciencedirect.com/science/article/pii/S1367578824000518",
-            "summary": "Distributed algorithms for resource allocation and consensus. Includes auction-based methods, greedy assignments, and negotiation protocols for agents to allocate tasks without global information.",
-            "key_concepts": [
-                "Auction-based allocation",
-                "Greedy assignment",
-                "Negotiation protocols",
-                "Distributed consensus"
-            ],
-            "algorithms": [
-                "First-price sealed bid auction",
-                "Vickrey auction",
-                "Combinatorial auctions",
-                "Contract net protocol"
-            ]
-        },
-        "path_finding_negotiation": {
-            "title": "Decentralized Multi-Agent Path Finding Framework",
-            "authors": ["Springer"],
-            "year": 2024,
-            "url": "https://link.springer.com/article/10.1007/s10458-024-09639-8",
-            "summary": "Framework for automated negotiation in multi-agent systems. Focuses on conflict resolution and coordination without centralized control.",
-            "key_concepts": [
-                "Automated negotiation",
-                "Conflict resolution",
-                "Decentralized coordination",
-                "Path finding algorithms"
-            ],
-            "algorithms": [
-                "Alternating offers",
-                "Multi-lateral negotiation",
-                "Best-response dynamics"
-            ]
-        },
-        "swarm_intelligence": {
-            "title": "Swarm Intelligence Decentralized Decision Making",
-            "authors": ["IEEE"],
-            "year": 2023,
-            "url": "https://ieeexplore.ieee.org/document/10192625",
-            "summary": "Democratic systems that avoid centralized control through swarm intelligence. Includes voting, distributed negotiation, and best-response dynamics.",
-            "key_concepts": [
-                "Swarm intelligence",
-                "Collective behavior",
-                "Distributed voting",
-                "Emergent coordination"
-            ],
-            "algorithms": [
-                "Particle swarm optimization",
-                "Ant colony optimization",
-                "Bee colony algorithms",
-                "Flocking behaviors"
-            ]
-        },
-        "distributed_computing": {
-            "title": "Distributed Computing in Multi-Agent Systems",
-            "authors": ["Springer"],
-            "year": 2024,
-            "url": "https://link.springer.com/content/pdf/10.1007/s00607-024-01356-0.pdf",
-            "summary": "Privacy-preserving distributed machine learning. Algorithms maintain data confidentiality by splitting learning tasks among agents, essential for democratic distributed systems.",
-            "key_concepts": [
-                "Distributed machine learning",
-                "Privacy preservation",
-                "Federated learning",
-                "Data sovereignty"
-            ],
-            "algorithms": [
-                "Federated averaging",
-                "Split learning",
-                "Differential privacy"
-            ]
-        }
-    }
+    # Indexes and caches are class-level; instances only bind the database
+    __slots__ = ("database",)
+    
+    # Read-only paper database, shared by every instance
+    RESEARCH_DATABASE = _RESEARCH_DATABASE
+    
+    # Lowercased copies of each paper's id and text fields, built once
+    _LOWERED: Optional[Mapping[str, Mapping[str, Any]]] = None
+    
+    # Algorithm entries per paper, as returned by get_algorithms, built once
+    _ALGORITHMS_BY_PAPER: Optional[Mapping[str, Tuple[Dict[str, Any], ...]]] = None
+    
+    # Searchable text of RESEARCH_DATABASE, flattened once into
+    # (paper_id, score weight, lowercased text) fields
+    _FIELDS: Optional[List[Tuple[str, int, str]]] = None
+    
+    # Inverted index: query word -> indexes of the fields containing it,
+    # filled in as words are first searched for
+    _INDEX: Dict[str, Tuple[int, ...]] = {}
+    _INDEX_MAX_WORDS = 4096
+    
+    # Reverse index: lowercased algorithm name -> ids of the papers with an
+    # algorithm containing it, filled in as names are first looked up
+    _ALGORITHM_INDEX: Dict[str, Tuple[str, ...]] = {}
+    
+    # Ranked (paper id, score) results per single-word query
+    _WORD_RANKING: Dict[str, Tuple[Tuple[str, int], ...]] = {}
     
     def __init__(self):
         """Initialize research assistant"""
-        self.database = self.RESEARCH_DATABASE
+        self.database = _RESEARCH_DATABASE
+    
+    @classmethod
+    def _lowered(cls) -> Mapping[str, Mapping[str, Any]]:
+        """Read-only lowercased view of every paper, kept apart from the
+        paper dicts so it never shows up in results"""
+        if cls._LOWERED is None:
+            cls._LOWERED = MappingProxyType({
+                paper_id: MappingProxyType({
+                    "id": paper_id.lower(),
+                    "title": paper["title"].lower(),
+                    "summary": paper["summary"].lower(),
+                    "key_concepts": tuple(concept.lower() for concept in paper["key_concepts"]),
+                    "algorithms": tuple(algo.lower() for algo in paper["algorithms"]),
+                })
+                for paper_id, paper in cls.RESEARCH_DATABASE.items()
+            })
+        return cls._LOWERED
+    
+    @classmethod
+    def _algorithm_entries(cls) -> Mapping[str, Tuple[Dict[str, Any], ...]]:
+        """Algorithm entries of every paper, in database order"""
+        if cls._ALGORITHMS_BY_PAPER is None:
+            cls._ALGORITHMS_BY_PAPER = MappingProxyType({
+                paper_id: tuple({
+                    "algorithm": algo,
+                    "source_paper": paper["title"],
+                    "year": paper["year"],
+                    "paper_id": paper_id
+                } for algo in paper["algorithms"])
+                for paper_id, paper in cls.RESEARCH_DATABASE.items()
+            })
+        return cls._ALGORITHMS_BY_PAPER
+    
+    @classmethod
+    def _build_index(cls) -> List[Tuple[str, int, str]]:
+        """Flatten the database into weighted search fields, once per process"""
+        if cls._FIELDS is None:
+            fields = []
+            for paper_id, lowered in cls._lowered().items():
+                fields.append((paper_id, 3, lowered["title"]))
+                fields.append((paper_id, 2, lowered["summary"]))
+                fields.extend((paper_id, 2, concept) for concept in lowered["key_concepts"])
+                fields.extend((paper_id, 1, algo) for algo in lowered["algorithms"])
+            cls._FIELDS = fields
+        return cls._FIELDS
+    
+    @classmethod
+    def _lookup(cls, word: str) -> Tuple[int, ...]:
+        """Indexes of the fields containing word, from the inverted index"""
+        postings = cls._INDEX.get(word)
+        if postings is None:
+            postings = tuple(i for i, (_, _, text) in enumerate(cls._build_index()) if word in text)
+            if len(cls._INDEX) >= cls._INDEX_MAX_WORDS:
+                cls._INDEX.clear()
+            cls._INDEX[word] = postings
+        return postings
+    
+    @classmethod
+    def _rank(cls, field_indexes) -> List[Tuple[str, int]]:
+        """(paper id, score) for the given matched fields, best first"""
+        # A field scores once however many query words it contains: title 3,
+        # summary 2, each key concept 2, each algorithm 1
+        fields = cls._build_index()
+        scores = Counter()
+        for i in field_indexes:
+            paper_id, weight, _ = fields[i]
+            scores[paper_id] += weight
+        
+        # Database order breaks score ties, as the stable sort keeps it
+        ranked = [(paper_id, scores[paper_id]) for paper_id in _RESEARCH_DATABASE if paper_id in scores]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+    
+    @classmethod
+    def _rank_word(cls, word: str) -> Tuple[Tuple[str, int], ...]:
+        """Ranking for a single-word query, memoized alongside its postings"""
+        ranked = cls._WORD_RANKING.get(word)
+        if ranked is None:
+            ranked = tuple(cls._rank(cls._lookup(word)))
+            if len(cls._WORD_RANKING) >= cls._INDEX_MAX_WORDS:
+                cls._WORD_RANKING.clear()
+            cls._WORD_RANKING[word] = ranked
+        return ranked
+    
+    @classmethod
+    def _papers_with_algorithm(cls, name_lower: str) -> Tuple[str, ...]:
+        """Ids of papers listing an algorithm whose name contains name_lower"""
+        paper_ids = cls._ALGORITHM_INDEX.get(name_lower)
+        if paper_ids is None:
+            paper_ids = tuple(
+                paper_id for paper_id, lowered in cls._lowered().items()
+                if any(name_lower in algo for algo in lowered["algorithms"])
+            )
+            if len(cls._ALGORITHM_INDEX) >= cls._INDEX_MAX_WORDS:
+                cls._ALGORITHM_INDEX.clear()
+            cls._ALGORITHM_INDEX[name_lower] = paper_ids
+        return paper_ids
     
     def search_papers(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
@@ -167,41 +378,18 @@ class AcademicResearchAssistant:
         Returns:
             List of matching papers
         """
-        query_lower = query.lower()
-        results = []
-        
-        for paper_id, paper in self.database.items():
-            score = 0
-            
-            # Check title
-            if any(word in paper["title"].lower() for word in query_lower.split()):
-                score += 3
-            
-            # Check summary
-            if any(word in paper["summary"].lower() for word in query_lower.split()):
-                score += 2
-            
-            # Check key concepts
-            for concept in paper["key_concepts"]:
-                if any(word in concept.lower() for word in query_lower.split()):
-                    score += 2
-            
-            # Check algorithms
-            for algo in paper["algorithms"]:
-                if any(word in algo.lower() for word in query_lower.split()):
-                    score += 1
-            
-            if score > 0:
-                results.append({
-                    "id": paper_id,
-                    "score": score,
-                    **paper
-                })
-        
-        # Sort by score
-        results.sort(key=lambda x: x["score"], reverse=True)
+        words = query.lower().split()
+        if len(words) == 1:
+            # Common case: one keyword, answered from its memoized ranking
+            ranked = self._rank_word(words[0])
+        else:
+            matched = set()
+            for word in words:
+                matched.update(self._lookup(word))
+            ranked = self._rank(matched)
         
-        return results[:max_results]
+        return [{"id": paper_id, "score": score, **_RESEARCH_DATABASE[paper_id]}
+                for paper_id, score in ranked[:max_results]]
     
     def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -213,7 +401,7 @@ class AcademicResearchAssistant:
         Returns:
             Paper details or None
         """
-        return self.database.get(paper_id)
+        return _RESEARCH_DATABASE.get(paper_id)
     
     def get_algorithms(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -225,21 +413,19 @@ class AcademicResearchAssistant:
         Returns:
             List of algorithms with sources
         """
-        algorithms = []
-        
-        for paper_id, paper in self.database.items():
-            if category and category.lower() not in paper_id.lower():
-                continue
-            
-            for algo in paper["algorithms"]:
-                algorithms.append({
-                    "algorithm": algo,
-                    "source_paper": paper["title"],
-                    "year": paper["year"],
-                    "paper_id": paper_id
-                })
-        
-        return algorithms
+        entries = self._algorithm_entries()
+        if not category:
+            selected = chain.from_iterable(entries.values())
+        else:
+            category_lower = category.lower()
+            lowered = self._lowered()
+            selected = chain.from_iterable(
+                paper_entries for paper_id, paper_entries in entries.items()
+                if category_lower in lowered[paper_id]["id"]
+            )
+        
+        # Hand out copies so callers can't corrupt the cached entries
+        return [dict(entry) for entry in selected]
     
     def get_implementation_guide(self, algorithm_name: str) -> Dict[str, Any]:
         """
@@ -252,10 +438,7 @@ class AcademicResearchAssistant:
             Implementation guide
         """
         # Search for papers mentioning this algorithm
-        papers = []
-        for paper_id, paper in self.database.items():
-            if any(algorithm_name.lower() in algo.lower() for algo in paper["algorithms"]):
-                papers.append(paper)
+        papers = [self.database[paper_id] for paper_id in self._papers_with_algorithm(algorithm_name.lower())]
         
         if not papers:
             return {
@@ -274,63 +457,13 @@ class AcademicResearchAssistant:
     
     def _get_implementation_notes(self, algorithm_name: str) -> str:
         """Get implementation notes for algorithm"""
-        notes = {
-            "auction": "Implement sealed-bid or open auction. Agents bid based on cost/capability. Winner selected by lowest cost or highest value.",
-            "voting": "Each agent casts vote. Count votes and determine winner by majority, plurality, or threshold. Support weighted voting if needed.",
-            "consensus": "Request agreement from all agents. Require threshold (e.g., 66%) to reach consensus. Use timeout for non-responsive agents.",
-            "swarm": "Multiple agents work in parallel. Each explores solution space independently. Aggregate results to find best solution.",
-            "debate": "Agents propose solutions and critique each other. Multiple rounds of refinement. Final vote on best solution.",
-            "hierarchical": "Decompose problem into sub-problems. Allocate sub-problems to agents. Combine solutions bottom-up."
-        }
-        
-        for key, note in notes.items():
-            if key in algorithm_name.lower():
-                return note
-        
-        return "General implementation: Design agent coordination protocol, define message types, implement decision logic."
+        match = _NOTE_PATTERN.match(algorithm_name.lower())
+        return IMPLEMENTATION_NOTES[match.lastgroup] if match else DEFAULT_IMPLEMENTATION_NOTE
     
     def _get_code_example(self, algorithm_name: str) -> str:
         """Get code example for algorithm"""
-        if "auction" in algorithm_name.lower():
-            return """
-# Auction-based task allocation
-def allocate_via_auction(task, agents):
-    bids = {}
-    for agent in agents:
-        bids[agent.id] = agent.calculate_bid(task)
-    
-    winner = min(bids.items(), key=lambda x: x[1])[0]
-    return winner
-            """
-        elif "voting" in algorithm_name.lower():
-            return """
-# Democratic voting
-def vote_on_solution(solutions, agents):
-    votes = {}
-    for solution in solutions:
-        votes[solution] = 0
-    
-    for agent in agents:
-        choice = agent.vote(solutions)
-        votes[choice] += 1
-    
-    winner = max(votes.items(), key=lambda x: x[1])[0]
-    return winner
-            """
-        elif "consensus" in algorithm_name.lower():
-            return """
-# Consensus building
-def reach_consensus(proposal, agents, threshold=0.66):
-    agreements = 0
-    for agent in agents:
-        if agent.evaluate(proposal):
-            agreements += 1
-    
-    agreement_rate = agreements / len(agents)
-    return agreement_rate >= threshold
-            """
-        
-        return "# Code example not available for this algorithm"
+        match = _CODE_PATTERN.match(algorithm_name.lower())
+        return CODE_EXAMPLES[match.lastgroup] if match else DEFAULT_CODE_EXAMPLE
     
     def summarize_research(self, topic: str) -> str:
         """
@@ -356,15 +489,8 @@ def reach_consensus(proposal, agents, threshold=0.66):
             summary += f"   Key concepts: {', '.join(paper['key_concepts'][:3])}\n\n"
         
         # Extract common themes
-        all_concepts = []
-        for paper in papers:
-            all_concepts.extend(paper['key_concepts'])
-        
-        concept_counts = {}
-        for concept in all_concepts:
-            concept_counts[concept] = concept_counts.get(concept, 0) + 1
-        
-        common_concepts = sorted(concept_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        concept_counts = Counter(chain.from_iterable(paper['key_concepts'] for paper in papers))
+        common_concepts = concept_counts.most_common(5)
         
         summary += "\nCommon Themes:\n"
         for concept, count in common_concepts:
@@ -419,7 +545,7 @@ if __name__ == "__main__":
         paper = assistant.get_paper(paper_id)
         
         if paper:
-            print(json.dumps(paper, indent=2))
+            print(_dumps(paper))
         else:
             print(f"Paper not found: {paper_id}")
     
@@ -436,7 +562,7 @@ if __name__ == "__main__":
         algorithm = sys.argv[2] if len(sys.argv) > 2 else "voting"
         guide = assistant.get_implementation_guide(algorithm)
         
-        print(json.dumps(guide, indent=2))
+        print(_dumps(guide))
     
     elif action == "summarize":
         topic = sys.argv[2] if len(sys.argv) > 2 else "multi-agent systems"
@@ -445,7 +571,7 @@ if __name__ == "__main__":
     
     elif action == "stats":
         stats = assistant.get_statistics()
-        print(json.dumps(stats, indent=2))
+        print(_dumps(stats))
     
     else:
         print(f"Unknown action: {action}")
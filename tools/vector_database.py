@@ -5,12 +5,121 @@ Vector Database Manager for document ingestion and semantic search.
 Supports FOSS vector databases: ChromaDB, Qdrant, Weaviate
 """
 
+import asyncio
+import hashlib
 import json
+import multiprocessing
 import os
-import uuid
-from typing import List, Dict, Any, Optional
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Characters read per block when streaming files into chunks
+READ_BLOCK_CHARS = 1 << 20
+
+# Hashes looked up per SELECT against the embedding cache, kept under
+# SQLite's bound-parameter limit
+EMBED_CACHE_LOOKUP_BATCH = 500
+
+
+@lru_cache(maxsize=None)
+def _load_embedding_model(model_name: str, device: Optional[str] = None):
+    """Load a SentenceTransformer once per (model, device) and share it"""
+    from sentence_transformers import SentenceTransformer
+    
+    model = SentenceTransformer(model_name, device=device)
+    # Inference only: put dropout/batch-norm layers in eval mode once here
+    model.eval()
+    return model
+
+
+async def _to_thread(func, *args):
+    """Run a blocking call in the default executor (asyncio.to_thread
+    needs Python 3.9+)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+def _new_ids(count: int, hyphenated: bool = True) -> List[str]:
+    """Random version-4 UUID strings for count documents from one urandom read"""
+    if count <= 0:
+        return []
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    digits = raw.tobytes().hex()
+    if not hyphenated:
+        return [digits[i:i + 32] for i in range(0, len(digits), 32)]
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-"
+        f"{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, len(digits), 32)
+    ]
+
+
+def _dump_metadata(metadata: Dict[str, Any]) -> str:
+    """Serialize metadata for Weaviate's text property, via orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(metadata)
+
+
+def _load_metadata(raw: str) -> Dict[str, Any]:
+    """Parse metadata stored by _dump_metadata"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _encode_texts(model, texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode texts into unit-length vectors"""
+    # encode() already orders texts by length before batching and puts
+    # the vectors back in input order, so each batch pads only to its
+    # own longest text; sorting here first would be redundant
+    import torch
+    
+    # inference_mode skips autograd recording and tensor version counting
+    # for the whole call, which no_grad inside encode() does not
+    with torch.inference_mode():
+        return model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            # Unit-length vectors make inner product equal cosine similarity
+            normalize_embeddings=True
+        )
+
+
+def _chunk_and_encode_file(file_path: str, chunk_size: int, overlap: int, model_name: str,
+                           device: Optional[str], batch_size: int):
+    """Process-pool worker for ingest_files: chunk one file and embed it"""
+    try:
+        import torch
+        # One intra-op thread per worker, so N workers don't oversubscribe
+        # the cores
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    
+    chunks = list(VectorDatabaseManager._chunk_file(file_path, chunk_size, overlap))
+    if not chunks:
+        return chunks, None
+    vectors = _encode_texts(_load_embedding_model(model_name, device), chunks, batch_size)
+    return chunks, vectors.astype(np.float32)
+
+
 class VectorDatabaseManager:
     """
     Unified interface for FOSS vector databases.
@@ -23,12 +132,36 @@ class VectorDatabaseManager:
         
         Args:
             db_type: Type of vector DB ("chromadb", "qdrant", "weaviate")
-            config: Database-specific configuration
+            config: Database-specific configuration; "embedding_model" and
+                "device" (e.g. "cuda") select the local embedding model
         """
         self.db_type = db_type.lower()
         self.config = config or {}
         self.client = None
         self.collection = None
+        # Async handles, opened by the first awaited call: AsyncQdrantClient
+        # and, in Chroma HTTP mode, a collection on an AsyncHttpClient
+        self._aclient = None
+        self._achroma_collection = None
+        self._embed_model = None
+        # Content-hash keyed vectors survive restarts; a falsy path disables it
+        self._embed_cache_path = self.config.get("embed_cache", "./embed_cache.sqlite")
+        self._embed_cache = None
+        self._embed_cache_lock = threading.Lock()
+        # Semantic query cache: one normalized query vector per slot, with
+        # the (top_k, filters) key, results and time stored alongside.
+        # Entries expire after semantic_cache_ttl seconds, since writes from
+        # other managers or processes do not clear this cache
+        self._query_cache_size = self.config.get("semantic_cache_size", 512)
+        self._query_cache_tau = self.config.get("semantic_cache_tau", 0.97)
+        self._query_cache_ttl = self.config.get("semantic_cache_ttl", 60.0)
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_vecs = None
+        self._query_cache_entries = [None] * self._query_cache_size
+        self._query_cache_used = np.zeros(self._query_cache_size)
+        self._query_cache_tick = 0
+        # (monotonic time taken, stats) from the last get_stats backend query
+        self._stats_cache = (0.0, None)
         
         self._initialize_database()
     
@@ -49,17 +182,31 @@ class VectorDatabaseManager:
             import chromadb
             from chromadb.config import Settings
             
-            persist_directory = self.config.get("persist_directory", "./chroma_data")
-            
-            self.client = chromadb.Client(Settings(
-                persist_directory=persist_directory,
-                anonymized_telemetry=False  # FOSS privacy principle
-            ))
+            if self.config.get("mode") == "http":
+                # Client-server mode keeps the index in the Chroma server's
+                # memory instead of this process
+                self.client = chromadb.HttpClient(
+                    host=self.config.get("host", "localhost"),
+                    port=self.config.get("port", 8000),
+                    settings=Settings(anonymized_telemetry=False)
+                )
+            else:
+                persist_directory = self.config.get("persist_directory", "./chroma_data")
+                
+                self.client = chromadb.Client(Settings(
+                    persist_directory=persist_directory,
+                    anonymized_telemetry=False  # FOSS privacy principle
+                ))
             
             collection_name = self.config.get("collection_name", "opencode_docs")
+            # Embeddings are normalized, so inner product ranks like cosine
+            # without the per-comparison norms; applies to new collections
             self.collection = self.client.get_or_create_collection(
                 name=collection_name,
-                metadata={"description": "OpenCode multi-agent document store"}
+                metadata={
+                    "description": "OpenCode multi-agent document store",
+                    "hnsw:space": self.config.get("chroma_space", "ip")
+                }
             )
             
             print(f"ChromaDB initialized: {collection_name}")
@@ -72,23 +219,45 @@ class VectorDatabaseManager:
         """Initialize Qdrant (FOSS vector database)"""
         try:
             from qdrant_client import QdrantClient
-            from qdrant_client.models import Distance, VectorParams
-            
-            host = self.config.get("host", "localhost")
-            port = self.config.get("port", 6333)
+            from qdrant_client.models import (
+                Distance, VectorParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+                HnswConfigDiff, OptimizersConfigDiff
+            )
             
-            self.client = QdrantClient(host=host, port=port)
+            self.client = QdrantClient(**self._qdrant_connection())
             
             collection_name = self.config.get("collection_name", "opencode_docs")
             vector_size = self.config.get("vector_size", 384)  # Default for MiniLM
             
+            # int8 scalar quantization keeps a 4x smaller copy of every vector
+            # in RAM for search, so the float32 originals can live on disk
+            quantized = self.config.get("quantization", "int8") == "int8"
+            
             # Create collection if not exists
             try:
                 self.client.get_collection(collection_name)
             except Exception:
                 self.client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+                    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=quantized),
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                    ) if quantized else None,
+                    # Index tuning: a larger hnsw_m (graph degree) and
+                    # hnsw_ef_construct raise recall at a given search speed
+                    # but slow indexing and grow the graph; hnsw_on_disk
+                    # saves RAM at the cost of query latency. Payloads stay
+                    # on disk, and segments over memmap_threshold KB are
+                    # memory-mapped instead of held in RAM
+                    hnsw_config=HnswConfigDiff(
+                        m=self.config.get("hnsw_m", 16),
+                        ef_construct=self.config.get("hnsw_ef_construct", 128),
+                        on_disk=self.config.get("hnsw_on_disk", False)
+                    ),
+                    optimizers_config=OptimizersConfigDiff(
+                        memmap_threshold=self.config.get("memmap_threshold", 20000)
+                    ),
+                    on_disk_payload=True
                 )
             
             self.collection = collection_name
@@ -159,48 +328,78 @@ class VectorDatabaseManager:
         """
         doc_ids = []
         
-        if self.db_type == "chromadb":
-            doc_ids = self._add_chromadb(documents, embeddings)
-        elif self.db_type == "qdrant":
-            doc_ids = self._add_qdrant(documents, embeddings)
-        elif self.db_type == "weaviate":
-            doc_ids = self._add_weaviate(documents, embeddings)
+        try:
+            if self.db_type == "chromadb":
+                doc_ids = self._add_chromadb(documents, embeddings)
+            elif self.db_type == "qdrant":
+                doc_ids = self._add_qdrant(documents, embeddings)
+            elif self.db_type == "weaviate":
+                doc_ids = self._add_weaviate(documents, embeddings)
+        finally:
+            # New documents can change any cached search result and the
+            # count, even when only part of a batch was written
+            self._query_cache_clear()
+            self._stats_cache = (0.0, None)
         
         return doc_ids
     
+    def _doc_ids(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Each document's own id, or a freshly generated UUID"""
+        fresh_ids = iter(_new_ids(sum("id" not in doc for doc in documents)))
+        return [doc["id"] if "id" in doc else next(fresh_ids) for doc in documents]
+    
     def _add_chromadb(self, documents: List[Dict[str, Any]], 
                       embeddings: Optional[List[List[float]]]) -> List[str]:
         """Add documents to ChromaDB"""
-        doc_ids = [doc.get("id", str(uuid.uuid4())) for doc in documents]
-        contents = [doc["content"] for doc in documents]
-        metadatas = [doc.get("metadata", {}) for doc in documents]
-        
-        if embeddings:
-            self.collection.add(
-                ids=doc_ids,
-                embeddings=embeddings,
-                documents=contents,
-                metadatas=metadatas
-            )
-        else:
-            # ChromaDB will compute embeddings automatically
-            self.collection.add(
-                ids=doc_ids,
-                documents=contents,
-                metadatas=metadatas
-            )
+        # One pass builds all three columns; documents without an id take
+        # the next pre-generated one, in the compact 32-character hex form
+        fresh_ids = iter(_new_ids(sum("id" not in doc for doc in documents), hyphenated=False))
+        doc_ids, contents, metadatas = [], [], []
+        for doc in documents:
+            doc_ids.append(doc["id"] if "id" in doc else next(fresh_ids))
+            contents.append(doc["content"])
+            metadatas.append(doc.get("metadata", {}))
+        
+        # Embed with the local model rather than Chroma's default function,
+        # so stored vectors share a space with the query embeddings
+        if not embeddings:
+            embeddings = self._compute_embeddings(contents)
+        
+        self.collection.add(
+            ids=doc_ids,
+            embeddings=embeddings,
+            documents=contents,
+            metadatas=metadatas
+        )
         
         return doc_ids
     
     def _add_qdrant(self, documents: List[Dict[str, Any]], 
                     embeddings: Optional[List[List[float]]]) -> List[str]:
         """Add documents to Qdrant"""
-        from qdrant_client.models import PointStruct
-        
         if not embeddings:
             embeddings = self._compute_embeddings([doc["content"] for doc in documents])
         
-        doc_ids = [doc.get("id", str(uuid.uuid4())) for doc in documents]
+        doc_ids = self._doc_ids(documents)
+        points = self._qdrant_points(documents, doc_ids, embeddings)
+        
+        # Bounded requests let the server index one batch while the next is
+        # in flight; only the last one waits, and since updates apply in
+        # order, every point is visible once it returns
+        batch_size = self.config.get("upsert_batch", 256)
+        for start in range(0, len(points), batch_size):
+            self.client.upsert(
+                collection_name=self.collection,
+                points=points[start:start + batch_size],
+                wait=start + batch_size >= len(points)
+            )
+        
+        return doc_ids
+    
+    def _qdrant_points(self, documents: List[Dict[str, Any]], doc_ids: List[str],
+                       embeddings: List[List[float]]) -> List[Any]:
+        """Build Qdrant points for documents and their vectors"""
+        from qdrant_client.models import PointStruct
         
         points = []
         for i, doc in enumerate(documents):
@@ -212,41 +411,48 @@ class VectorDatabaseManager:
                     "metadata": doc.get("metadata", {})
                 }
             ))
-        
-        self.client.upsert(
-            collection_name=self.collection,
-            points=points
-        )
-        
-        return doc_ids
+        return points
     
     def _add_weaviate(self, documents: List[Dict[str, Any]], 
                       embeddings: Optional[List[List[float]]]) -> List[str]:
         """Add documents to Weaviate"""
-        doc_ids = []
+        doc_ids = self._doc_ids(documents)
         
-        for doc in documents:
-            doc_id = doc.get("id", str(uuid.uuid4()))
-            
-            data_object = {
-                "content": doc["content"],
-                "metadata": json.dumps(doc.get("metadata", {})),
-                "doc_id": doc_id
-            }
-            
-            if embeddings:
-                # Weaviate handles embeddings automatically in most cases
-                self.client.data_object.create(
-                    data_object=data_object,
-                    class_name=self.collection
-                )
-            else:
-                self.client.data_object.create(
-                    data_object=data_object,
-                    class_name=self.collection
+        # The batcher does not raise on per-object failures; collect them
+        # from each response so they can be raised once the batch is done
+        errors = []
+        
+        def collect_errors(results):
+            for result in results or ():
+                object_errors = result.get("result", {}).get("errors", {}).get("error")
+                if object_errors:
+                    errors.append("; ".join(error.get("message", str(error)) for error in object_errors))
+        
+        # The batcher ships objects in bulk requests instead of one HTTP
+        # round trip per document, and flushes when the block exits
+        self.client.batch.configure(
+            batch_size=self.config.get("weaviate_batch_size", 100),
+            dynamic=True,
+            callback=collect_errors
+        )
+        with self.client.batch as batch:
+            for i, doc in enumerate(documents):
+                data_object = {
+                    "content": doc["content"],
+                    "metadata": _dump_metadata(doc.get("metadata", {})),
+                    "doc_id": doc_ids[i]
+                }
+                
+                batch.add_data_object(
+                    data_object,
+                    class_name=self.collection,
+                    vector=embeddings[i] if embeddings else None
                 )
-            
-            doc_ids.append(doc_id)
+        
+        if errors:
+            raise RuntimeError(
+                f"Weaviate rejected {len(errors)} of {len(documents)} objects: {errors[0]}"
+            )
         
         return doc_ids
     
@@ -263,40 +469,182 @@ class VectorDatabaseManager:
         Returns:
             List of matching documents with scores
         """
-        if self.db_type == "chromadb":
-            return self._search_chromadb(query, top_k, filters)
-        elif self.db_type == "qdrant":
-            return self._search_qdrant(query, top_k, filters)
-        elif self.db_type == "weaviate":
+        if self.db_type == "weaviate":
+            # Vectorized server-side, so there is no local embedding to cache on
             return self._search_weaviate(query, top_k, filters)
+        if self.db_type not in ("chromadb", "qdrant"):
+            return []
         
-        return []
+        # Near-duplicate queries with the same top_k and filters reuse the
+        # results of an earlier search instead of a backend round trip
+        query_embedding = self._compute_embeddings([query])[0]
+        cache_key = (top_k, json.dumps(filters, sort_keys=True, default=str))
+        cached = self._query_cache_get(query_embedding, cache_key)
+        if cached is not None:
+            return cached
+        
+        if self.db_type == "chromadb":
+            matches = self._search_chromadb(query, top_k, filters, query_embedding)
+        else:
+            matches = self._search_qdrant(query, top_k, filters, query_embedding)
+        
+        self._query_cache_put(query_embedding, cache_key, matches)
+        return matches
+    
+    def search_many(self, queries: List[str], top_k: int = 5,
+                    filters: Optional[Dict] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once.
+        
+        All queries are embedded in one batched encode, and the ones not
+        answered by the query cache go to the backend in a single request.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results to return per query
+            filters: Optional metadata filters, applied to every query
+        
+        Returns:
+            One list of matching documents per query, in query order
+        """
+        if self.db_type == "weaviate":
+            return [self._search_weaviate(query, top_k, filters) for query in queries]
+        if self.db_type not in ("chromadb", "qdrant") or not queries:
+            return [[] for _ in queries]
+        
+        query_embeddings = self._compute_embeddings(queries)
+        cache_key = (top_k, json.dumps(filters, sort_keys=True, default=str))
+        results = [self._query_cache_get(embedding, cache_key) for embedding in query_embeddings]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            return results
+        
+        if self.db_type == "chromadb":
+            batch = self.collection.query(
+                query_embeddings=[query_embeddings[i] for i in misses],
+                n_results=top_k,
+                where=filters
+            )
+            found = [self._chroma_matches(batch, n) for n in range(len(misses))]
+        else:
+            from qdrant_client.models import SearchRequest
+            
+            batch = self.client.search_batch(
+                collection_name=self.collection,
+                requests=[SearchRequest(vector=query_embeddings[i], limit=top_k, with_payload=True)
+                          for i in misses]
+            )
+            found = [self._qdrant_matches(scored) for scored in batch]
+        
+        for i, matches in zip(misses, found):
+            self._query_cache_put(query_embeddings[i], cache_key, matches)
+            results[i] = matches
+        return results
+    
+    def _query_cache_get(self, query_embedding: List[float],
+                         cache_key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Results of the most similar unexpired cached query above the threshold"""
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm == 0:
+            return None
+        
+        with self._query_cache_lock:
+            if self._query_cache_vecs is None:
+                return None
+            
+            # Slots are pre-normalized, so one matrix-vector product gives
+            # every cosine similarity; empty slots are zero vectors and
+            # never match
+            sims = self._query_cache_vecs @ (query_vec / norm)
+            now = time.monotonic()
+            for slot in np.argsort(-sims):
+                if sims[slot] < self._query_cache_tau:
+                    break
+                entry = self._query_cache_entries[slot]
+                if entry is None or entry[0] != cache_key:
+                    continue
+                if now - entry[2] >= self._query_cache_ttl:
+                    # Expired: free the slot and keep looking
+                    self._query_cache_vecs[slot] = 0
+                    self._query_cache_entries[slot] = None
+                    self._query_cache_used[slot] = 0
+                    continue
+                self._query_cache_tick += 1
+                self._query_cache_used[slot] = self._query_cache_tick
+                return [dict(match) for match in entry[1]]
+        return None
+    
+    def _query_cache_put(self, query_embedding: List[float], cache_key: tuple,
+                         matches: List[Dict[str, Any]]):
+        """Store search results, evicting the least recently used slot"""
+        if self._query_cache_size <= 0 or self._query_cache_ttl <= 0:
+            return
+        
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm == 0:
+            return
+        entry = (cache_key, [dict(match) for match in matches], time.monotonic())
+        
+        with self._query_cache_lock:
+            if self._query_cache_vecs is None:
+                self._query_cache_vecs = np.zeros((self._query_cache_size, query_vec.shape[0]), dtype=np.float32)
+            
+            slot = int(np.argmin(self._query_cache_used))
+            self._query_cache_vecs[slot] = query_vec / norm
+            self._query_cache_entries[slot] = entry
+            self._query_cache_tick += 1
+            self._query_cache_used[slot] = self._query_cache_tick
+    
+    def _query_cache_clear(self):
+        """Drop every cached search result"""
+        with self._query_cache_lock:
+            if self._query_cache_vecs is not None:
+                self._query_cache_vecs.fill(0)
+            self._query_cache_entries = [None] * self._query_cache_size
+            self._query_cache_used.fill(0)
     
     def _search_chromadb(self, query: str, top_k: int, 
-                         filters: Optional[Dict]) -> List[Dict[str, Any]]:
+                         filters: Optional[Dict],
+                         query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
         """Search ChromaDB"""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=top_k,
-            where=filters
-        )
+        if query_embedding is not None:
+            # Same local model that embedded the stored documents
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k,
+                where=filters
+            )
+        else:
+            results = self.collection.query(
+                query_texts=[query],
+                n_results=top_k,
+                where=filters
+            )
         
-        matches = []
-        if results and results["documents"]:
-            for i, doc in enumerate(results["documents"][0]):
-                matches.append({
-                    "id": results["ids"][0][i],
-                    "content": doc,
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "score": results["distances"][0][i] if results["distances"] else 0.0
-                })
+        return self._chroma_matches(results)
+    
+    def _chroma_matches(self, results: Dict[str, Any], query_index: int = 0) -> List[Dict[str, Any]]:
+        """Convert one query's slice of a Chroma query result to match dicts"""
+        if not (results and results["documents"]):
+            return []
         
-        return matches
+        # Pull this query's columns out once and zip them row-wise
+        docs = results["documents"][query_index]
+        metadatas = results["metadatas"][query_index] if results["metadatas"] else [{} for _ in docs]
+        distances = results["distances"][query_index] if results["distances"] else [0.0] * len(docs)
+        return [
+            {"id": doc_id, "content": doc, "metadata": metadata, "score": distance}
+            for doc_id, doc, metadata, distance in zip(results["ids"][query_index], docs, metadatas, distances)
+        ]
     
     def _search_qdrant(self, query: str, top_k: int, 
-                       filters: Optional[Dict]) -> List[Dict[str, Any]]:
+                       filters: Optional[Dict],
+                       query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
         """Search Qdrant"""
-        query_embedding = self._compute_embeddings([query])[0]
+        if query_embedding is None:
+            query_embedding = self._compute_embeddings([query])[0]
         
         results = self.client.search(
             collection_name=self.collection,
@@ -304,16 +652,19 @@ class VectorDatabaseManager:
             limit=top_k
         )
         
-        matches = []
-        for result in results:
-            matches.append({
+        return self._qdrant_matches(results)
+    
+    def _qdrant_matches(self, results: List[Any]) -> List[Dict[str, Any]]:
+        """Convert Qdrant scored points to match dicts"""
+        return [
+            {
                 "id": result.id,
                 "content": result.payload.get("content", ""),
                 "metadata": result.payload.get("metadata", {}),
                 "score": result.score
-            })
-        
-        return matches
+            }
+            for result in results
+        ]
     
     def _search_weaviate(self, query: str, top_k: int, 
                          filters: Optional[Dict]) -> List[Dict[str, Any]]:
@@ -326,35 +677,249 @@ class VectorDatabaseManager:
             .do()
         )
         
-        matches = []
-        if results and "data" in results and "Get" in results["data"]:
-            for item in results["data"]["Get"].get(self.collection, []):
-                matches.append({
-                    "id": item.get("doc_id", ""),
-                    "content": item.get("content", ""),
-                    "metadata": json.loads(item.get("metadata", "{}")),
-                    "score": 1.0  # Weaviate doesn't always return scores
-                })
+        if not (results and "data" in results and "Get" in results["data"]):
+            return []
+        
+        return [
+            {
+                "id": item.get("doc_id", ""),
+                "content": item.get("content", ""),
+                "metadata": _load_metadata(item.get("metadata", "{}")),
+                "score": 1.0  # Weaviate doesn't always return scores
+            }
+            for item in results["data"]["Get"].get(self.collection, [])
+        ]
+    
+    async def aadd_documents(self, documents: List[Dict[str, Any]],
+                             embeddings: Optional[List[List[float]]] = None) -> List[str]:
+        """
+        Add documents without blocking the event loop.
+        
+        For Qdrant and Chroma in HTTP mode, batches are embedded in a
+        worker thread while earlier batches are still being written; other
+        backends run add_documents in a thread.
         
+        Args:
+            documents: List of documents with 'content' and optional 'metadata'
+            embeddings: Pre-computed embeddings (optional, will compute if None)
+        
+        Returns:
+            List of document IDs
+        """
+        if self.db_type == "qdrant":
+            client = self._async_qdrant()
+            
+            def write(batch, batch_ids, vectors):
+                return client.upsert(
+                    collection_name=self.collection,
+                    points=self._qdrant_points(batch, batch_ids, vectors),
+                    wait=True
+                )
+        elif self.db_type == "chromadb" and self.config.get("mode") == "http":
+            collection = await self._async_chroma()
+            
+            def write(batch, batch_ids, vectors):
+                return collection.add(
+                    ids=batch_ids,
+                    embeddings=vectors,
+                    documents=[doc["content"] for doc in batch],
+                    metadatas=[doc.get("metadata", {}) for doc in batch]
+                )
+        else:
+            return await _to_thread(self.add_documents, documents, embeddings)
+        
+        doc_ids = self._doc_ids(documents)
+        batch_size = self.config.get("upsert_batch", 256)
+        
+        writes = []
+        try:
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start:start + batch_size]
+                if embeddings:
+                    vectors = embeddings[start:start + batch_size]
+                else:
+                    vectors = await _to_thread(self._compute_embeddings, [doc["content"] for doc in batch])
+                
+                writes.append(asyncio.create_task(write(batch, doc_ids[start:start + batch_size], vectors)))
+            await asyncio.gather(*writes)
+        except BaseException:
+            for task in writes:
+                task.cancel()
+            raise
+        finally:
+            self._query_cache_clear()
+            self._stats_cache = (0.0, None)
+        
+        return doc_ids
+    
+    async def asearch(self, query: str, top_k: int = 5,
+                      filters: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Search for similar documents without blocking the event loop.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filters: Optional metadata filters
+        
+        Returns:
+            List of matching documents with scores
+        """
+        if self.db_type != "qdrant":
+            return await _to_thread(self.search, query, top_k, filters)
+        
+        query_embedding = (await _to_thread(self._compute_embeddings, [query]))[0]
+        cache_key = (top_k, json.dumps(filters, sort_keys=True, default=str))
+        cached = self._query_cache_get(query_embedding, cache_key)
+        if cached is not None:
+            return cached
+        
+        results = await self._async_qdrant().search(
+            collection_name=self.collection,
+            query_vector=query_embedding,
+            limit=top_k
+        )
+        matches = self._qdrant_matches(results)
+        
+        self._query_cache_put(query_embedding, cache_key, matches)
         return matches
     
+    def _async_qdrant(self):
+        """AsyncQdrantClient for the configured server, created on first use"""
+        if self._aclient is None:
+            from qdrant_client import AsyncQdrantClient
+            
+            self._aclient = AsyncQdrantClient(**self._qdrant_connection())
+        return self._aclient
+    
+    def _qdrant_connection(self) -> Dict[str, Any]:
+        """Connection settings shared by the sync and async Qdrant clients"""
+        # gRPC keeps one multiplexed HTTP/2 connection open and sends
+        # points in binary instead of JSON over REST
+        return {
+            "host": self.config.get("host", "localhost"),
+            "port": self.config.get("port", 6333),
+            "grpc_port": self.config.get("grpc_port", 6334),
+            "prefer_grpc": self.config.get("prefer_grpc", True)
+        }
+    
+    async def _async_chroma(self):
+        """Collection on a Chroma AsyncHttpClient, created on first use"""
+        if self._achroma_collection is None:
+            import chromadb
+            
+            if not hasattr(chromadb, "AsyncHttpClient"):
+                raise ImportError(
+                    "Async Chroma HTTP mode needs chromadb>=0.5.0. "
+                    "Install with: pip install -U chromadb"
+                )
+            
+            client = await chromadb.AsyncHttpClient(
+                host=self.config.get("host", "localhost"),
+                port=self.config.get("port", 8000)
+            )
+            self._achroma_collection = await client.get_or_create_collection(
+                name=self.collection.name,
+                metadata={
+                    "description": "OpenCode multi-agent document store",
+                    "hnsw:space": self.config.get("chroma_space", "ip")
+                }
+            )
+        return self._achroma_collection
+    
+    async def aclose(self):
+        """Close the async clients, if any were opened"""
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
+        self._achroma_collection = None
+    
     def _compute_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Compute embeddings using local FOSS model.
         Uses sentence-transformers (FOSS) with MiniLM model.
+        Vectors already in the embedding cache are reused; only misses
+        are encoded.
         """
         try:
-            from sentence_transformers import SentenceTransformer
-            
-            model_name = self.config.get("embedding_model", "all-MiniLM-L6-v2")
-            model = SentenceTransformer(model_name)
-            
-            embeddings = model.encode(texts, convert_to_numpy=True)
-            return embeddings.tolist()
-            
+            if self._embed_model is None:
+                # Loaded on first use and shared by managers with the same
+                # model and device, instead of reloading per call
+                self._embed_model = _load_embedding_model(
+                    self.config.get("embedding_model", "all-MiniLM-L6-v2"),
+                    self.config.get("device")
+                )
         except ImportError:
             print("sentence-transformers not installed. Install with: pip install sentence-transformers")
             raise
+        
+        if not self._embed_cache_path:
+            return self._encode(texts).tolist()
+        
+        model_name = self.config.get("embedding_model", "all-MiniLM-L6-v2")
+        hashes = [hashlib.sha256(text.encode('utf-8')).digest() for text in texts]
+        cached = self._embed_cache_get(model_name, hashes)
+        
+        # Encode each distinct uncached text once
+        misses = {}
+        for text, digest in zip(texts, hashes):
+            if digest not in cached and digest not in misses:
+                misses[digest] = text
+        if misses:
+            vectors = self._encode(list(misses.values())).astype(np.float32)
+            new_rows = dict(zip(misses, vectors))
+            self._embed_cache_put(model_name, new_rows)
+            cached.update(new_rows)
+        
+        return [cached[digest].tolist() for digest in hashes]
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the embedding model over texts in batches"""
+        return _encode_texts(self._embed_model, texts, self.config.get("embed_batch_size", 64))
+    
+    def _get_embed_cache(self) -> sqlite3.Connection:
+        """Open the embedding cache database on first use"""
+        if self._embed_cache is None:
+            conn = sqlite3.connect(self._embed_cache_path, check_same_thread=False)
+            conn.executescript('''
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash BLOB NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vec BLOB NOT NULL,
+                    PRIMARY KEY (model, hash)
+                ) WITHOUT ROWID;
+            ''')
+            self._embed_cache = conn
+        return self._embed_cache
+    
+    def _embed_cache_get(self, model_name: str, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Cached float32 vectors for the given content hashes"""
+        unique = list(dict.fromkeys(hashes))
+        found = {}
+        with self._embed_cache_lock:
+            conn = self._get_embed_cache()
+            for i in range(0, len(unique), EMBED_CACHE_LOOKUP_BATCH):
+                batch = unique[i:i + EMBED_CACHE_LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [model_name, *batch]
+                )
+                for digest, vec in rows:
+                    found[digest] = np.frombuffer(vec, dtype=np.float32)
+        return found
+    
+    def _embed_cache_put(self, model_name: str, vectors: Dict[bytes, np.ndarray]):
+        """Store newly computed float32 vectors in one transaction"""
+        with self._embed_cache_lock:
+            conn = self._get_embed_cache()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, hash, dim, vec) VALUES (?, ?, ?, ?)",
+                    [(model_name, digest, vec.shape[0], vec.tobytes()) for digest, vec in vectors.items()]
+                )
     
     def ingest_file(self, file_path: str, chunk_size: int = 500, 
                    overlap: int = 50) -> List[str]:
@@ -369,47 +934,159 @@ class VectorDatabaseManager:
         Returns:
             List of document IDs
         """
-        # Read file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Stream the file so only a read block and one batch of chunks are
+        # resident; a cheap counting pass first gives total_chunks
+        step = self._chunk_step(chunk_size, overlap)
+        total_chunks = len(range(0, self._count_chars(file_path), step))
+        batch_size = self.config.get("ingest_batch", 256)
+        
+        doc_ids = []
+        batch = []
+        for chunk in self._chunk_file(file_path, chunk_size, overlap):
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                doc_ids.extend(self._ingest_chunks(file_path, batch, len(doc_ids), total_chunks))
+                batch = []
+        if batch:
+            doc_ids.extend(self._ingest_chunks(file_path, batch, len(doc_ids), total_chunks))
+        
+        return doc_ids
+    
+    def ingest_files(self, file_paths: List[str], chunk_size: int = 500,
+                     overlap: int = 50, max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Ingest several document files, chunking and embedding in parallel.
+        
+        Worker processes each read, chunk and encode whole files while this
+        process adds the finished ones to the database in order.
+        
+        Args:
+            file_paths: Paths to document files
+            chunk_size: Size of text chunks
+            overlap: Overlap between chunks
+            max_workers: Worker process count (defaults to the CPU count)
         
-        # Chunk the document
-        chunks = self._chunk_text(content, chunk_size, overlap)
+        Returns:
+            Document IDs per file path
+        """
+        self._chunk_step(chunk_size, overlap)
+        if self.db_type == "weaviate":
+            # Weaviate vectorizes server-side, so there is nothing to offload
+            return {path: self.ingest_file(path, chunk_size, overlap) for path in file_paths}
         
+        batch_size = self.config.get("ingest_batch", 256)
+        results = {}
+        # spawn, not fork: forking a parent that already holds torch
+        # threads can deadlock the children
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(
+                    _chunk_and_encode_file, path, chunk_size, overlap,
+                    self.config.get("embedding_model", "all-MiniLM-L6-v2"),
+                    self.config.get("device"),
+                    self.config.get("embed_batch_size", 64)
+                )
+                for path in file_paths
+            ]
+            for path, future in zip(file_paths, futures):
+                chunks, vectors = future.result()
+                doc_ids = []
+                for start in range(0, len(chunks), batch_size):
+                    doc_ids.extend(self._ingest_chunks(
+                        path, chunks[start:start + batch_size], start, len(chunks),
+                        vectors[start:start + batch_size].tolist()
+                    ))
+                results[path] = doc_ids
+        
+        return results
+    
+    def _ingest_chunks(self, file_path: str, chunks: List[str], first_chunk_id: int,
+                       total_chunks: int, embeddings: Optional[List[List[float]]] = None) -> List[str]:
+        """Embed and add one batch of a file's chunks"""
         # Create document objects
         documents = []
-        for i, chunk in enumerate(chunks):
+        for i, chunk in enumerate(chunks, first_chunk_id):
             documents.append({
                 "content": chunk,
                 "metadata": {
                     "source": file_path,
                     "chunk_id": i,
-                    "total_chunks": len(chunks),
+                    "total_chunks": total_chunks,
                     "ingested_at": datetime.now().isoformat()
                 }
             })
         
+        # Embed the batch in one encode; Weaviate vectorizes server-side
+        # and ignores client embeddings
+        if embeddings is None and self.db_type != "weaviate":
+            embeddings = self._compute_embeddings(chunks)
+        
         # Add to database
-        return self.add_documents(documents)
+        return self.add_documents(documents, embeddings=embeddings)
+    
+    @staticmethod
+    def _count_chars(file_path: str) -> int:
+        """Number of characters in a UTF-8 text file, read in blocks"""
+        count = 0
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for block in iter(lambda: f.read(READ_BLOCK_CHARS), ''):
+                count += len(block)
+        return count
+    
+    @staticmethod
+    def _chunk_file(file_path: str, chunk_size: int, overlap: int) -> Iterator[str]:
+        """Yield the same chunks as _chunk_text without reading the whole file"""
+        step = VectorDatabaseManager._chunk_step(chunk_size, overlap)
+        
+        # buf holds the text from absolute offset base; start is the absolute
+        # offset of the next chunk, which may lie past buf when step > chunk_size
+        buf = ''
+        base = 0
+        start = 0
+        with open(file_path, 'r', encoding='utf-8') as f:
+            eof = False
+            while not eof:
+                block = f.read(READ_BLOCK_CHARS)
+                eof = not block
+                
+                consumed = min(start - base, len(buf))
+                buf = buf[consumed:] + block
+                base += consumed
+                
+                end = base + len(buf)
+                while start + chunk_size <= end or (eof and start < end):
+                    yield buf[start - base:start - base + chunk_size]
+                    start += step
+    
+    @staticmethod
+    def _chunk_step(chunk_size: int, overlap: int) -> int:
+        """Distance between chunk starts, rejecting sizes that cannot advance"""
+        step = chunk_size - overlap
+        if chunk_size <= 0 or step <= 0:
+            # A non-positive step would never advance through the text
+            raise ValueError(f"chunk_size ({chunk_size}) must be positive and larger than overlap ({overlap})")
+        return step
     
     def _chunk_text(self, text: str, chunk_size: int, overlap: int) -> List[str]:
         """Split text into overlapping chunks"""
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            if chunk:
-                chunks.append(chunk)
-            
-            start += chunk_size - overlap
+        step = self._chunk_step(chunk_size, overlap)
         
-        return chunks
+        # Every start offset is known up front, so slice them all in one pass
+        return [text[start:start + chunk_size] for start in range(0, len(text), step)]
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get database statistics"""
+        """Get database statistics, reusing a recent result for stats_ttl seconds"""
+        taken_at, stats = self._stats_cache
+        if stats is not None and time.monotonic() - taken_at < self.config.get("stats_ttl", 5.0):
+            return dict(stats)
+        
+        stats = self._query_stats()
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
+    
+    def _query_stats(self) -> Dict[str, Any]:
+        """Fetch database statistics from the backend"""
         if self.db_type == "chromadb":
             count = self.collection.count()
             return {